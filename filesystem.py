@@ -1,9 +1,29 @@
 import os
-import subprocess
+import signal
+import sys
 import asyncio
+import codecs
+import ctypes
+import ctypes.util
+import fnmatch
+import json
+import mmap
+import re
+import struct
+import tempfile
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Any, Dict, List, Optional
-from mcp.server.fastmcp import FastMCP
+from stat import S_ISDIR, S_ISREG
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from mcp.server.fastmcp import FastMCP, Context
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
 
 # Initialize FastMCP server
 mcp = FastMCP("filesystem-command")
@@ -13,6 +33,38 @@ ALLOWED_EXTENSIONS = {'.txt', '.py', '.java', '.js', '.json', '.md', '.csv', '.l
 MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
 BLOCKED_COMMANDS = {'rm', 'del', 'format', 'mkfs', 'dd', 'shutdown', 'reboot', 'halt', 'poweroff'}
 DEFAULT_ENCODING = 'utf-8'
+ENCODINGS = ['utf-8', 'gbk', 'gb2312', 'latin-1', 'cp1252']
+ENCODING_SAMPLE_SIZE = 64 * 1024
+ENCODING_CACHE_SIZE = 1024
+CONTENT_CACHE_BYTES = 64 * 1024 * 1024  # 64MB of decoded text
+DEFAULT_PAGE_SIZE = 1000
+SEARCH_WORKERS = min(32, (os.cpu_count() or 1) + 4)
+SEARCH_BATCH_SIZE = 64  # files per worker task
+BINARY_SNIFF_SIZE = 8192
+WRITE_CHUNK_SIZE = 1024 * 1024
+FSYNC_POLICIES = ('none', 'file', 'full')  # full also syncs the parent directory
+BATCH_WORKERS = 8
+MAX_BATCH_ITEMS = 100
+INDEX_RESCAN_INTERVAL = 30  # seconds between rescans when inotify is unavailable
+INDEX_EXCLUDED_DIRS = {'.git', 'node_modules', '__pycache__', '.venv', 'venv'}
+MAX_CONCURRENT_COMMANDS = 4
+MAX_OUTPUT_BYTES = 1024 * 1024  # 1MB retained per stream (head + tail)
+OUTPUT_CHUNK_SIZE = 64 * 1024
+
+# Read once while the process is still single-threaded; os.umask can only be read by setting it
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+# Limits how many shell commands run at once across all sessions
+_command_semaphore = asyncio.Semaphore(MAX_CONCURRENT_COMMANDS)
+
+# Shared by search tasks; file reads release the GIL while they wait on disk
+_search_executor = ThreadPoolExecutor(max_workers=SEARCH_WORKERS, thread_name_prefix="search")
+_batch_executor = ThreadPoolExecutor(max_workers=BATCH_WORKERS, thread_name_prefix="batch")
+
+# Detected encodings: file key -> (mtime_ns, size, encoding)
+_encoding_cache: "OrderedDict[tuple[int, int], tuple[int, int, str]]" = OrderedDict()
+_encoding_lock = threading.Lock()
 
 def is_safe_path(path: str) -> bool:
     """Check if the path is safe (no directory traversal)."""
@@ -35,60 +87,420 @@ def is_safe_command(command: str) -> bool:
     base_command = cmd_parts[0].lower()
     return base_command not in BLOCKED_COMMANDS
 
-async def read_file_content(file_path: str) -> str | None:
-    """Read file content with multiple encoding attempts."""
-    encodings = ['utf-8', 'gbk', 'gb2312', 'latin-1', 'cp1252']
-    
-    for encoding in encodings:
+class ContentCache:
+    """LRU cache of decoded file contents within a memory budget.
+
+    Entries are keyed by file_key and only served while the file's
+    (mtime_ns, size, inode) still match the cached stat. Safe to use from
+    worker threads.
+    """
+
+    def __init__(self, budget: int = CONTENT_CACHE_BYTES):
+        self.budget = budget
+        self.used = 0
+        self.hits = 0
+        self.misses = 0
+        self.entries: "OrderedDict[tuple[int, int], tuple[tuple[int, int, int], str, str, int]]" = OrderedDict()
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def signature(stat: os.stat_result) -> tuple[int, int, int]:
+        return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+    def get(self, key: tuple[int, int], stat: os.stat_result) -> tuple[str, str] | None:
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or entry[0] != self.signature(stat):
+                if entry is not None:
+                    self._discard(key)
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[1], entry[2]
+
+    def put(self, key: tuple[int, int], stat: os.stat_result, content: str, encoding: str) -> None:
+        cost = sys.getsizeof(content)
+        with self.lock:
+            self._discard(key)
+            if cost > self.budget:
+                return
+            self.entries[key] = (self.signature(stat), content, encoding, cost)
+            self.used += cost
+            while self.used > self.budget:
+                _, evicted = self.entries.popitem(last=False)
+                self.used -= evicted[3]
+
+    def _discard(self, key: tuple[int, int]) -> None:
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self.used -= entry[3]
+
+_content_cache = ContentCache()
+
+def file_key(stat: os.stat_result) -> tuple[int, int]:
+    """Cache key for a file, taken from a stat the caller already has.
+
+    Every path to the file (symlinks, hard links) shares one entry without
+    resolving the path on each read.
+    """
+    return (stat.st_dev, stat.st_ino)
+
+def detect_encoding(data: bytes) -> str | None:
+    """Pick the first of ENCODINGS that decodes a prefix sample of the data."""
+    sample = data[:ENCODING_SAMPLE_SIZE]
+    for encoding in ENCODINGS:
         try:
-            with open(file_path, 'r', encoding=encoding) as f:
-                return f.read()
+            # Incremental decode tolerates a multibyte character cut by the sample
+            codecs.getincrementaldecoder(encoding)().decode(sample, final=False)
+            return encoding
         except UnicodeDecodeError:
             continue
-        except Exception:
+    return None
+
+def cached_encoding(key: tuple[int, int], mtime_ns: int, size: int) -> str | None:
+    """Return the encoding detected earlier for an unchanged file."""
+    with _encoding_lock:
+        entry = _encoding_cache.get(key)
+        if entry is None or entry[:2] != (mtime_ns, size):
             return None
+        _encoding_cache.move_to_end(key)
+        return entry[2]
+
+def remember_encoding(key: tuple[int, int], mtime_ns: int, size: int, encoding: str) -> None:
+    with _encoding_lock:
+        _encoding_cache[key] = (mtime_ns, size, encoding)
+        _encoding_cache.move_to_end(key)
+        while len(_encoding_cache) > ENCODING_CACHE_SIZE:
+            _encoding_cache.popitem(last=False)
+
+def decode_content(data: bytes, key: tuple[int, int], mtime_ns: int, size: int) -> tuple[str, str] | None:
+    """Decode file bytes with a single pass in the detected encoding.
+
+    If the full decode disagrees with the prefix sample, the remaining
+    candidates are tried in order.
+    """
+    decoded = decode_bytes(data, cached_encoding(key, mtime_ns, size) or detect_encoding(data))
+    if decoded is not None:
+        remember_encoding(key, mtime_ns, size, decoded[1])
+    return decoded
+
+def decode_bytes(data: bytes, encoding: str | None) -> tuple[str, str] | None:
+    """Decode with `encoding`, falling back to the candidates after it."""
+    if encoding is None:
+        return None
+    
+    for candidate in ENCODINGS[ENCODINGS.index(encoding):]:
+        try:
+            return data.decode(candidate), candidate
+        except UnicodeDecodeError:
+            continue
     
     return None
 
-async def execute_system_command(command: str, cwd: str, timeout: int = 30) -> Dict[str, Any]:
-    """Execute system command safely with timeout."""
+def _read_and_decode(file_path: str) -> Dict[str, Any] | None:
+    start = time.perf_counter()
     try:
-        result = subprocess.run(
-            command,
-            shell=True,
-            cwd=cwd,
-            capture_output=True,
-            text=True,
-            timeout=timeout,
-            encoding='utf-8',
-            errors='replace'
-        )
+        with open(file_path, 'rb') as f:
+            stat = os.fstat(f.fileno())
+            data = f.read()
+    except Exception:
+        return None
+    
+    key = file_key(stat)
+    decoded = decode_content(data, key, stat.st_mtime_ns, stat.st_size)
+    if decoded is None:
+        return None
+    
+    _content_cache.put(key, stat, decoded[0], decoded[1])
+    return {
+        'content': decoded[0],
+        'encoding': decoded[1],
+        'elapsed': time.perf_counter() - start,
+        'cached': False
+    }
+
+async def read_file_content(file_path: str, stat: Optional[os.stat_result] = None) -> Dict[str, Any] | None:
+    """Read a file once and decode it in its detected encoding.
+
+    Returns the content, the encoding used, the seconds spent and whether
+    it came from the content cache, or None if no supported encoding fits.
+    Pass the file's stat to validate the cache without another stat call.
+    Cache misses are read in a worker thread.
+    """
+    start = time.perf_counter()
+    try:
+        stat = stat or os.stat(file_path)
+    except OSError:
+        return None
+    
+    cached = cached_content(stat, start)
+    if cached is not None:
+        return cached
+    
+    return await asyncio.to_thread(_read_and_decode, file_path)
+
+def cached_content(stat: os.stat_result, start: float) -> Dict[str, Any] | None:
+    cached = _content_cache.get(file_key(stat), stat)
+    if cached is None:
+        return None
+    return {
+        'content': cached[0],
+        'encoding': cached[1],
+        'elapsed': time.perf_counter() - start,
+        'cached': True
+    }
+
+def decode_slice(data: bytes, encoding: str | None = None) -> str | None:
+    """Decode a byte slice cut from the middle of a file.
+
+    UTF-8 sequences split by the slice boundaries are dropped rather than
+    forcing a fallback to a legacy encoding. If the file's encoding is
+    already known it is used directly.
+    """
+    if encoding is not None and encoding != 'utf-8':
+        return data.decode(encoding, errors='replace')
+    
+    trimmed = data
+    for _ in range(3):
+        if trimmed[:1] and 0x80 <= trimmed[0] <= 0xBF:
+            trimmed = trimmed[1:]
+    try:
+        return codecs.getincrementaldecoder('utf-8')().decode(trimmed, final=False)
+    except UnicodeDecodeError:
+        pass
+    
+    for encoding in ENCODINGS[1:]:
+        try:
+            return data.decode(encoding)
+        except UnicodeDecodeError:
+            continue
+    
+    return None
+
+def line_span(mm: mmap.mmap, start_line: int, end_line: int) -> tuple[int, int]:
+    """Return the byte span covering 1-based lines start_line..end_line.
+
+    A negative start_line counts from the end of the file (-10 = last 10
+    lines); end_line of 0 means through the end of the file.
+    """
+    size = len(mm)
+    if start_line < 0:
+        start = size - 1 if size and mm[size - 1:size] == b'\n' else size
+        for _ in range(-start_line):
+            start = mm.rfind(b'\n', 0, start)
+            if start < 0:
+                break
+        return start + 1, size
+    
+    start = 0
+    for _ in range(max(start_line, 1) - 1):
+        start = mm.find(b'\n', start) + 1
+        if start == 0:
+            return size, size
+    
+    if end_line <= 0:
+        return start, size
+    
+    end = start
+    for _ in range(end_line - max(start_line, 1) + 1):
+        end = mm.find(b'\n', end) + 1
+        if end == 0:
+            return start, size
+    return start, end
+
+def read_file_range(
+    file_path: str,
+    offset: int = 0,
+    length: int = 0,
+    start_line: int = 0,
+    end_line: int = 0
+) -> tuple[bytes, int, int, int]:
+    """Read a byte or line range of a file through mmap.
+
+    Only the requested pages are touched, so the cost is proportional to the
+    slice rather than the file. A negative offset counts from the end of the
+    file. Returns (data, start, end, file_size); the slice is capped at
+    MAX_FILE_SIZE bytes.
+    """
+    with open(file_path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return b'', 0, 0, 0
         
-        return {
-            'success': True,
-            'returncode': result.returncode,
-            'stdout': result.stdout,
-            'stderr': result.stderr
-        }
-    except subprocess.TimeoutExpired:
-        return {
-            'success': False,
-            'error': f'Command timed out after {timeout} seconds',
-            'returncode': -1
-        }
-    except Exception as e:
-        return {
-            'success': False,
-            'error': str(e),
-            'returncode': -1
-        }
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if start_line or end_line:
+                start, end = line_span(mm, start_line, end_line)
+            else:
+                start = max(size + offset, 0) if offset < 0 else min(offset, size)
+                end = min(start + length, size) if length > 0 else size
+            
+            end = min(end, start + MAX_FILE_SIZE)
+            return mm[start:end], start, end, size
+
+def _children_cpu_time() -> float:
+    """Return user+system CPU seconds consumed by terminated child processes."""
+    if resource is None:
+        return 0.0
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+async def kill_process_tree(process: asyncio.subprocess.Process) -> None:
+    """Kill a command and everything it spawned, then reap it.
+
+    The process group outlives the shell that leads it, so the group is
+    killed even when the shell itself has already exited (e.g. after
+    `server &`), leaving only its background children.
+    """
+    try:
+        if os.name == 'posix':
+            os.killpg(process.pid, signal.SIGKILL)
+        elif process.returncode is None:
+            process.kill()
+    except (ProcessLookupError, PermissionError):
+        pass
+    await process.wait()
+
+class OutputBuffer:
+    """Retain the head and tail of a byte stream within a fixed budget.
+
+    The first half of the budget keeps the start of the output, the second
+    half is a ring buffer over the most recent bytes. Everything in between
+    is counted in `dropped`.
+    """
+
+    def __init__(self, limit: int = MAX_OUTPUT_BYTES):
+        self.head_limit = limit // 2
+        self.tail_limit = limit - self.head_limit
+        self.head = bytearray()
+        self.tail = bytearray()
+        self.total = 0
+
+    def write(self, data: bytes) -> None:
+        self.total += len(data)
+        if len(self.head) < self.head_limit:
+            room = self.head_limit - len(self.head)
+            self.head += data[:room]
+            data = data[room:]
+        if data:
+            self.tail += data
+            if len(self.tail) > self.tail_limit:
+                del self.tail[:len(self.tail) - self.tail_limit]
+
+    @property
+    def dropped(self) -> int:
+        return self.total - len(self.head) - len(self.tail)
+
+    def text(self) -> str:
+        head = self.head.decode('utf-8', errors='replace')
+        tail = self.tail.decode('utf-8', errors='replace')
+        if self.dropped:
+            return f"{head}\n... [{self.dropped:,} bytes dropped] ...\n{tail}"
+        return head + tail
+
+async def pump_stream(
+    stream: asyncio.StreamReader,
+    buffer: OutputBuffer,
+    name: str,
+    on_output: Optional[Callable[[str, bytes], Awaitable[None]]] = None
+) -> None:
+    """Copy a process pipe into a buffer chunk by chunk, forwarding each chunk."""
+    while True:
+        chunk = await stream.read(OUTPUT_CHUNK_SIZE)
+        if not chunk:
+            break
+        buffer.write(chunk)
+        if on_output is not None:
+            await on_output(name, chunk)
+
+async def execute_system_command(
+    command: str,
+    cwd: str,
+    timeout: int = 30,
+    on_output: Optional[Callable[[str, bytes], Awaitable[None]]] = None
+) -> Dict[str, Any]:
+    """Execute system command without blocking the event loop.
+
+    At most MAX_CONCURRENT_COMMANDS commands run at once. On timeout or
+    cancellation the whole process group is killed. CPU time is taken from
+    RUSAGE_CHILDREN and is approximate when other commands exit concurrently.
+    Output is read incrementally into OutputBuffers; `on_output` is awaited
+    with ('stdout' | 'stderr', chunk) as data arrives.
+    """
+    async with _command_semaphore:
+        wall_start = time.perf_counter()
+        cpu_start = _children_cpu_time()
+        stdout_buffer = OutputBuffer()
+        stderr_buffer = OutputBuffer()
+        process = None
+        
+        def collected(**fields: Any) -> Dict[str, Any]:
+            return {
+                **fields,
+                'stdout': stdout_buffer.text(),
+                'stderr': stderr_buffer.text(),
+                'stdout_dropped': stdout_buffer.dropped,
+                'stderr_dropped': stderr_buffer.dropped,
+                'wall_time': time.perf_counter() - wall_start,
+                'cpu_time': _children_cpu_time() - cpu_start
+            }
+        
+        try:
+            process = await asyncio.create_subprocess_shell(
+                command,
+                cwd=cwd,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                start_new_session=(os.name == 'posix')
+            )
+            await asyncio.wait_for(
+                asyncio.gather(
+                    pump_stream(process.stdout, stdout_buffer, 'stdout', on_output),
+                    pump_stream(process.stderr, stderr_buffer, 'stderr', on_output),
+                    process.wait()
+                ),
+                timeout=timeout
+            )
+            
+            return collected(success=True, returncode=process.returncode)
+        except asyncio.TimeoutError:
+            await kill_process_tree(process)
+            return collected(
+                success=False,
+                error=f'Command timed out after {timeout} seconds',
+                returncode=-1
+            )
+        except asyncio.CancelledError:
+            if process is not None:
+                await asyncio.shield(kill_process_tree(process))
+            raise
+        except Exception as e:
+            if process is not None:
+                await kill_process_tree(process)
+            return {
+                'success': False,
+                'error': str(e),
+                'returncode': -1
+            }
 
 @mcp.tool()
-async def read_file(file_path: str) -> str:
-    """Read the contents of a text file.
+async def read_file(
+    file_path: str,
+    offset: int = 0,
+    length: int = 0,
+    start_line: int = 0,
+    end_line: int = 0
+) -> str:
+    """Read the contents of a text file, optionally only a byte or line range.
+    
+    Ranged reads also work on files larger than the size limit.
     
     Args:
         file_path: Path to the file to read
+        offset: Byte offset to start at; negative counts from the end (default: 0)
+        length: Number of bytes to read, 0 for the rest of the file (default: 0)
+        start_line: First line to read (1-based); negative reads the last N lines (default: 0, whole file)
+        end_line: Last line to read (inclusive), 0 for the end of the file (default: 0)
     """
     if not is_safe_path(file_path):
         return f"Error: Unsafe file path: {file_path}"
@@ -97,29 +509,155 @@ async def read_file(file_path: str) -> str:
         return f"Error: File type not allowed: {Path(file_path).suffix}"
     
     path = Path(file_path)
-    if not path.exists():
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
         return f"Error: File does not exist: {file_path}"
+    except Exception as e:
+        return f"Error reading file: {str(e)}"
     
-    if not path.is_file():
+    if not S_ISREG(stat.st_mode):
         return f"Error: Path is not a file: {file_path}"
     
-    if path.stat().st_size > MAX_FILE_SIZE:
-        return f"Error: File too large (>{MAX_FILE_SIZE} bytes): {file_path}"
+    if offset or length or start_line or end_line:
+        try:
+            data, start, end, size = read_file_range(str(path), offset, length, start_line, end_line)
+        except Exception as e:
+            return f"Error reading file: {str(e)}"
+        
+        content = decode_slice(data, cached_encoding(file_key(stat), stat.st_mtime_ns, stat.st_size))
+        if content is None:
+            return f"Error: Unable to read file with supported encodings: {file_path}"
+        
+        return f"File: {file_path}\nRange: bytes {start}-{end} of {size}\n\n{content}"
     
-    content = await read_file_content(str(path))
-    if content is None:
+    if stat.st_size > MAX_FILE_SIZE:
+        return f"Error: File too large (>{MAX_FILE_SIZE} bytes), use offset/length or start_line/end_line: {file_path}"
+    
+    result = await read_file_content(str(path), stat)
+    if result is None:
         return f"Error: Unable to read file with supported encodings: {file_path}"
     
-    return f"File: {file_path}\nSize: {len(content)} characters\n\n{content}"
+    content = result['content']
+    source = "cached" if result['cached'] else "read"
+    return (
+        f"File: {file_path}\nSize: {len(content)} characters\n"
+        f"Encoding: {result['encoding']} ({source} in {result['elapsed'] * 1000:.1f} ms)\n\n{content}"
+    )
+
+def fsync_directory(directory: str) -> None:
+    """Persist a rename by syncing the directory entry (no-op where unsupported)."""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+def write_chunks(fd: int, data: bytes) -> None:
+    view = memoryview(data)
+    for start in range(0, len(view), WRITE_CHUNK_SIZE):
+        chunk = view[start:start + WRITE_CHUNK_SIZE]
+        while chunk:
+            chunk = chunk[os.write(fd, chunk):]
+
+def write_file_bytes(
+    file_path: str,
+    data: bytes,
+    append: bool = False,
+    atomic: bool = False,
+    fsync: str = 'none'
+) -> None:
+    """Write already-encoded bytes to a file, creating parent directories.
+
+    Data is written with os.write in WRITE_CHUNK_SIZE chunks. Appends use
+    O_APPEND. With `atomic`, the new contents (for appends, the old
+    contents plus the new data) go to a temp file in the same directory
+    that then replaces the target with os.replace, so readers and crashes
+    see either the old or the new file. A symlinked `file_path` is resolved
+    first, so the link is kept and its target replaced. `fsync` is one of
+    FSYNC_POLICIES.
+    """
+    if fsync not in FSYNC_POLICIES:
+        raise ValueError(f"Unknown fsync policy: {fsync}")
+    
+    path = Path(file_path)
+    
+    def create(opener: Callable[[], Any]) -> Any:
+        # Parent directories are only created when the first attempt fails
+        try:
+            return opener()
+        except FileNotFoundError:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            return opener()
+    
+    if not atomic:
+        flags = os.O_WRONLY | os.O_CREAT | (os.O_APPEND if append else os.O_TRUNC)
+        fd = create(lambda: os.open(path, flags | getattr(os, 'O_BINARY', 0), 0o666))
+        try:
+            write_chunks(fd, data)
+            if fsync != 'none':
+                os.fsync(fd)
+        finally:
+            os.close(fd)
+        if fsync == 'full':
+            fsync_directory(str(path.parent))
+        return
+    
+    # Replace the symlink's target, not the link itself
+    path = Path(os.path.realpath(path))
+    try:
+        mode = os.stat(path).st_mode & 0o7777
+    except FileNotFoundError:
+        mode = 0o666 & ~_UMASK
+    
+    fd, temp_path = create(lambda: tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp"))
+    try:
+        try:
+            if append and path.exists():
+                with open(path, 'rb') as existing:
+                    while True:
+                        chunk = existing.read(WRITE_CHUNK_SIZE)
+                        if not chunk:
+                            break
+                        write_chunks(fd, chunk)
+            write_chunks(fd, data)
+            if fsync != 'none':
+                os.fsync(fd)
+        finally:
+            os.close(fd)
+        os.chmod(temp_path, mode)
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
+    
+    if fsync == 'full':
+        fsync_directory(str(path.parent))
 
 @mcp.tool()
-async def write_file(file_path: str, content: str, encoding: str = DEFAULT_ENCODING) -> str:
+async def write_file(
+    file_path: str,
+    content: str,
+    encoding: str = DEFAULT_ENCODING,
+    atomic: bool = False,
+    fsync: str = "none"
+) -> str:
     """Write content to a text file.
     
     Args:
         file_path: Path to the file to write
         content: Content to write to the file
         encoding: File encoding (default: utf-8)
+        atomic: Write to a temp file and rename it over the target, so the file is never left half-written (default: False)
+        fsync: "none", "file" (fsync the data) or "full" (also fsync the directory) (default: none)
     """
     if not is_safe_path(file_path):
         return f"Error: Unsafe file path: {file_path}"
@@ -127,29 +665,40 @@ async def write_file(file_path: str, content: str, encoding: str = DEFAULT_ENCOD
     if not is_allowed_file(file_path):
         return f"Error: File type not allowed: {Path(file_path).suffix}"
     
-    if len(content.encode(encoding)) > MAX_FILE_SIZE:
+    if fsync not in FSYNC_POLICIES:
+        return f"Error: Unknown fsync policy: {fsync} (use one of: {', '.join(FSYNC_POLICIES)})"
+    
+    try:
+        data = content.encode(encoding)
+    except (LookupError, UnicodeEncodeError) as e:
+        return f"Error writing file: {str(e)}"
+    
+    if len(data) > MAX_FILE_SIZE:
         return f"Error: Content too large (>{MAX_FILE_SIZE} bytes)"
     
     try:
-        path = Path(file_path)
-        path.parent.mkdir(parents=True, exist_ok=True)
-        
-        with open(path, 'w', encoding=encoding) as f:
-            f.write(content)
-        
+        await asyncio.to_thread(write_file_bytes, file_path, data, False, atomic, fsync)
         return f"Successfully wrote {len(content)} characters to: {file_path}"
     
     except Exception as e:
         return f"Error writing file: {str(e)}"
 
 @mcp.tool()
-async def append_file(file_path: str, content: str, encoding: str = DEFAULT_ENCODING) -> str:
+async def append_file(
+    file_path: str,
+    content: str,
+    encoding: str = DEFAULT_ENCODING,
+    atomic: bool = False,
+    fsync: str = "none"
+) -> str:
     """Append content to a text file.
     
     Args:
         file_path: Path to the file to append to
         content: Content to append to the file
         encoding: File encoding (default: utf-8)
+        atomic: Rewrite the file through a temp file and rename instead of appending in place (default: False)
+        fsync: "none", "file" (fsync the data) or "full" (also fsync the directory) (default: none)
     """
     if not is_safe_path(file_path):
         return f"Error: Unsafe file path: {file_path}"
@@ -157,35 +706,678 @@ async def append_file(file_path: str, content: str, encoding: str = DEFAULT_ENCO
     if not is_allowed_file(file_path):
         return f"Error: File type not allowed: {Path(file_path).suffix}"
     
+    if fsync not in FSYNC_POLICIES:
+        return f"Error: Unknown fsync policy: {fsync} (use one of: {', '.join(FSYNC_POLICIES)})"
+    
     try:
-        path = Path(file_path)
+        data = content.encode(encoding)
         
         # Check final file size
-        current_size = path.stat().st_size if path.exists() else 0
-        if current_size + len(content.encode(encoding)) > MAX_FILE_SIZE:
+        try:
+            current_size = os.stat(file_path).st_size
+        except FileNotFoundError:
+            current_size = 0
+        if current_size + len(data) > MAX_FILE_SIZE:
             return f"Error: File would exceed size limit (>{MAX_FILE_SIZE} bytes)"
         
-        path.parent.mkdir(parents=True, exist_ok=True)
-        
-        with open(path, 'a', encoding=encoding) as f:
-            f.write(content)
+        await asyncio.to_thread(write_file_bytes, file_path, data, True, atomic, fsync)
         
         return f"Successfully appended {len(content)} characters to: {file_path}"
     
     except Exception as e:
         return f"Error appending to file: {str(e)}"
 
+def batch_read(file_path: str) -> Dict[str, Any]:
+    if not is_safe_path(file_path):
+        raise ValueError("Unsafe file path")
+    if not is_allowed_file(file_path):
+        raise ValueError(f"File type not allowed: {Path(file_path).suffix}")
+    
+    start = time.perf_counter()
+    stat = os.stat(file_path)
+    if not S_ISREG(stat.st_mode):
+        raise ValueError("Path is not a file")
+    if stat.st_size > MAX_FILE_SIZE:
+        raise ValueError(f"File too large (>{MAX_FILE_SIZE} bytes)")
+    
+    result = cached_content(stat, start) or _read_and_decode(file_path)
+    if result is None:
+        raise ValueError("Unable to read file with supported encodings")
+    return {'content': result['content'], 'encoding': result['encoding'], 'cached': result['cached']}
+
+def batch_stat(file_path: str) -> Dict[str, Any]:
+    if not is_safe_path(file_path):
+        raise ValueError("Unsafe path")
+    
+    index = find_index(file_path)
+    stat = index.lookup(os.path.abspath(file_path)) if index else None
+    if stat is None:
+        stat = os.stat(file_path)
+    
+    if S_ISREG(stat.st_mode):
+        item_type = 'file'
+    elif S_ISDIR(stat.st_mode):
+        item_type = 'dir'
+    else:
+        item_type = 'other'
+    return {
+        'type': item_type,
+        'size': stat.st_size,
+        'mode': oct(stat.st_mode & 0o7777),
+        'modified': stat.st_mtime,
+        'created': stat.st_ctime
+    }
+
+def batch_write(file_path: str, content: Optional[str], encoding: str = DEFAULT_ENCODING) -> Dict[str, Any]:
+    if not is_safe_path(file_path):
+        raise ValueError("Unsafe file path")
+    if content is None:
+        raise ValueError("Missing content")
+    if not is_allowed_file(file_path):
+        raise ValueError(f"File type not allowed: {Path(file_path).suffix}")
+    data = content.encode(encoding)
+    if len(data) > MAX_FILE_SIZE:
+        raise ValueError(f"Content too large (>{MAX_FILE_SIZE} bytes)")
+    
+    write_file_bytes(file_path, data)
+    return {'characters': len(content)}
+
+async def run_batch(operation: Callable[..., Dict[str, Any]], items: List[tuple]) -> str:
+    """Run `operation(*item)` for each item on the batch pool.
+
+    Returns a JSON document with one result per item, in order; failures
+    are reported per item as {"file_path": ..., "error": ...}.
+    """
+    if len(items) > MAX_BATCH_ITEMS:
+        return f"Error: Too many items in batch ({len(items)} > {MAX_BATCH_ITEMS})"
+    
+    loop = asyncio.get_running_loop()
+    
+    async def run(item: tuple) -> Dict[str, Any]:
+        try:
+            result = await loop.run_in_executor(_batch_executor, operation, *item)
+            return {'file_path': item[0], **result}
+        except Exception as e:
+            return {'file_path': item[0], 'error': str(e)}
+    
+    results = await asyncio.gather(*(run(item) for item in items))
+    failed = sum(1 for result in results if 'error' in result)
+    return json.dumps({'succeeded': len(results) - failed, 'failed': failed, 'results': results}, ensure_ascii=False)
+
 @mcp.tool()
-async def list_directory(directory_path: str = ".", show_hidden: bool = False) -> str:
+async def read_files(file_paths: List[str]) -> str:
+    """Read several text files concurrently in one call.
+    
+    Returns JSON with one result per file: content and encoding, or an error.
+    
+    Args:
+        file_paths: Paths of the files to read (at most 100)
+    """
+    return await run_batch(batch_read, [(file_path,) for file_path in file_paths])
+
+@mcp.tool()
+async def stat_files(file_paths: List[str]) -> str:
+    """Get type, size, mode and timestamps for several paths in one call.
+    
+    Returns JSON with one result per path, or an error.
+    
+    Args:
+        file_paths: Paths to examine (at most 100)
+    """
+    return await run_batch(batch_stat, [(file_path,) for file_path in file_paths])
+
+@mcp.tool()
+async def write_files(files: List[Dict[str, str]]) -> str:
+    """Write several text files concurrently in one call.
+    
+    Returns JSON with one result per file, or an error.
+    
+    Args:
+        files: Items like {"file_path": "a.txt", "content": "...", "encoding": "utf-8"} (encoding optional, at most 100)
+    """
+    items = []
+    seen = set()
+    for item in files:
+        file_path = item.get('file_path', '')
+        if os.path.abspath(file_path) in seen:
+            return f"Error: Duplicate path in batch: {file_path}"
+        seen.add(os.path.abspath(file_path))
+        items.append((file_path, item.get('content'), item.get('encoding', DEFAULT_ENCODING)))
+    return await run_batch(batch_write, items)
+
+def scandir_sorted(directory: str) -> List[os.DirEntry]:
+    """List a directory with os.scandir, sorted by name."""
+    with os.scandir(directory) as it:
+        return sorted(it, key=lambda e: e.name)
+
+def walk_sorted(
+    directory: str,
+    show_hidden: bool = False,
+    recursive: bool = False,
+    max_depth: int = 0,
+    after: tuple[str, ...] = (),
+    lister: Callable[[str], List[Any]] = scandir_sorted
+):
+    """Yield (relative parts, DirEntry | OSError) in sorted pre-order.
+
+    Uses os.scandir so file types come from the directory listing itself;
+    a FileIndex can supply its own `lister` to answer from memory instead.
+    Pre-order over name-sorted entries is lexicographic in the parts tuple,
+    which lets a cursor (`after`) skip whole subtrees that were already
+    returned. Symlinked directories are listed but not descended into.
+    """
+    def sorted_entries(current: str, prefix: tuple[str, ...]):
+        try:
+            entries = lister(current)
+        except OSError as e:
+            return iter([(prefix, e)])
+        return ((prefix + (entry.name,), entry) for entry in entries
+                if show_hidden or not entry.name.startswith('.'))
+    
+    stack = [sorted_entries(directory, ())]
+    while stack:
+        item = next(stack[-1], None)
+        if item is None:
+            stack.pop()
+            continue
+        
+        parts, entry = item
+        if parts > after or not parts:
+            yield parts, entry
+        if isinstance(entry, OSError):
+            continue
+        
+        if not recursive or (max_depth and len(parts) >= max_depth):
+            continue
+        if parts <= after and after[:len(parts)] != parts:
+            continue
+        try:
+            if entry.is_dir(follow_symlinks=False):
+                stack.append(sorted_entries(entry.path, parts))
+        except OSError:
+            continue
+
+def scan_directory(
+    directory: str,
+    show_hidden: bool = False,
+    pattern: str = "",
+    recursive: bool = False,
+    max_depth: int = 0,
+    cursor: str = "",
+    limit: int = DEFAULT_PAGE_SIZE,
+    lister: Callable[[str], List[Any]] = scandir_sorted
+) -> tuple[List[Dict[str, Any]], str | None]:
+    """Return one page of directory entries and the cursor for the next page.
+
+    Only regular files are stat'ed (for their size); types come from the
+    cached DirEntry data.
+    """
+    after = tuple(cursor.split('/')) if cursor else ()
+    items = []
+    
+    for parts, entry in walk_sorted(directory, show_hidden, recursive, max_depth, after, lister):
+        rel_path = '/'.join(parts)
+        if isinstance(entry, OSError):
+            if not parts:
+                raise entry
+            items.append({'path': rel_path, 'type': 'error', 'error': entry.strerror or str(entry)})
+            continue
+        
+        if pattern and not fnmatch.fnmatch(entry.name, pattern):
+            continue
+        
+        if len(items) == limit:
+            return items, items[-1]['path']
+        
+        try:
+            if entry.is_file():
+                items.append({'path': rel_path, 'type': 'file', 'size': entry.stat().st_size})
+            else:
+                items.append({'path': rel_path, 'type': 'dir', 'size': 0})
+        except OSError as e:
+            items.append({'path': rel_path, 'type': 'error', 'error': e.strerror or str(e)})
+    
+    return items, None
+
+class Inotify:
+    """Minimal ctypes binding for Linux inotify (directory watches only)."""
+
+    IN_MODIFY = 0x00000002
+    IN_ATTRIB = 0x00000004
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_Q_OVERFLOW = 0x00004000
+    IN_IGNORED = 0x00008000
+    IN_ONLYDIR = 0x01000000
+    IN_DONT_FOLLOW = 0x02000000
+    WATCH_MASK = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO
+                  | IN_CREATE | IN_DELETE | IN_ONLYDIR | IN_DONT_FOLLOW)
+    EVENT_HEADER = struct.Struct('iIII')
+
+    def __init__(self):
+        if not sys.platform.startswith('linux'):
+            raise OSError("inotify is only available on Linux")
+        self.libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self.fd = self.libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+    def add_watch(self, path: str) -> int:
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(path), self.WATCH_MASK)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {path}")
+        return wd
+
+    def rm_watch(self, wd: int) -> None:
+        self.libc.inotify_rm_watch(self.fd, wd)
+
+    def read_events(self) -> List[tuple[int, int, str]]:
+        """Drain pending events as (wd, mask, name) tuples."""
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        events = []
+        offset = 0
+        while offset + self.EVENT_HEADER.size <= len(data):
+            wd, mask, _cookie, length = self.EVENT_HEADER.unpack_from(data, offset)
+            offset += self.EVENT_HEADER.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b'\0'))
+            offset += length
+            events.append((wd, mask, name))
+        return events
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+class IndexEntry:
+    """Indexed metadata for one path.
+
+    Quacks like both os.DirEntry and os.stat_result so the directory walker
+    and the file info tool can use it in place of the real thing.
+    """
+
+    __slots__ = ('path', 'name', 'is_link', 'st_mode', 'st_size', 'st_ino',
+                 'st_atime', 'st_mtime', 'st_ctime', 'st_mtime_ns')
+
+    def __init__(self, path, name, is_link, st_mode, st_size, st_ino, st_atime, st_mtime, st_ctime, st_mtime_ns):
+        self.path = path
+        self.name = name
+        self.is_link = is_link
+        self.st_mode = st_mode
+        self.st_size = st_size
+        self.st_ino = st_ino
+        self.st_atime = st_atime
+        self.st_mtime = st_mtime
+        self.st_ctime = st_ctime
+        self.st_mtime_ns = st_mtime_ns
+
+    @classmethod
+    def from_stat(cls, path: str, is_link: bool, stat: os.stat_result) -> "IndexEntry":
+        return cls(path, os.path.basename(path), is_link, stat.st_mode, stat.st_size, stat.st_ino,
+                   stat.st_atime, stat.st_mtime, stat.st_ctime, stat.st_mtime_ns)
+
+    def row(self) -> list:
+        return [self.name, self.is_link, self.st_mode, self.st_size, self.st_ino,
+                self.st_atime, self.st_mtime, self.st_ctime, self.st_mtime_ns]
+
+    def is_file(self, follow_symlinks: bool = True) -> bool:
+        return S_ISREG(self.st_mode) and (follow_symlinks or not self.is_link)
+
+    def is_dir(self, follow_symlinks: bool = True) -> bool:
+        return S_ISDIR(self.st_mode) and (follow_symlinks or not self.is_link)
+
+    def is_symlink(self) -> bool:
+        return self.is_link
+
+    def stat(self, follow_symlinks: bool = True) -> "IndexEntry":
+        return self
+
+def stat_entry(path: str) -> IndexEntry | None:
+    """Stat a path (following symlinks where possible) into an IndexEntry."""
+    try:
+        link_stat = os.lstat(path)
+    except OSError:
+        return None
+    is_link = os.path.islink(path)
+    if is_link:
+        try:
+            return IndexEntry.from_stat(path, True, os.stat(path))
+        except OSError:
+            pass
+    return IndexEntry.from_stat(path, is_link, link_stat)
+
+class FileIndex:
+    """In-memory metadata index of a directory tree.
+
+    `dirs` maps each indexed directory's absolute path to {name: IndexEntry}.
+    It is rebuilt in a worker thread and only mutated on the event loop, so
+    readers in worker threads see either the old or the new mapping; single
+    dict reads and list(dict.values()) are atomic under the GIL. Rebuilds
+    and inotify events are applied in order by a single maintenance task;
+    events that arrive while a scan runs are replayed after the swap.
+
+    On Linux the index is kept current with inotify; elsewhere, or when the
+    watch limit is hit, it is rebuilt every INDEX_RESCAN_INTERVAL seconds.
+    Directories named in INDEX_EXCLUDED_DIRS are not indexed and are read
+    from disk when a query reaches them.
+    """
+
+    def __init__(self, root: str, persist_path: str = ""):
+        self.root = root
+        self.persist_path = persist_path
+        self.dirs: Dict[str, Dict[str, IndexEntry]] = {}
+        self.ready = False
+        self.built_at = 0.0
+        self.build_time = 0.0
+        self.events = 0
+        self.inotify: Optional[Inotify] = None
+        self.watches: Dict[int, str] = {}
+        self.watched_paths: Dict[str, int] = {}
+        self.watch_failed = False
+        self.poll_task: Optional[asyncio.Task] = None
+        self.task: Optional[asyncio.Task] = None  # maintenance task: rebuilds and queued events
+        self.queue: deque = deque()
+        self.dirty = False
+        self.mode = "polling"
+
+    def list_sorted(self, directory: str) -> List[Any]:
+        """Lister for walk_sorted; unindexed directories fall back to disk."""
+        children = self.dirs.get(directory)
+        if children is None:
+            return scandir_sorted(directory)
+        return sorted(list(children.values()), key=lambda e: e.name)
+
+    def lookup(self, path: str) -> IndexEntry | None:
+        parent, name = os.path.split(path)
+        children = self.dirs.get(parent)
+        return children.get(name) if children is not None else None
+
+    def scan_tree(self, top: str) -> tuple[Dict[str, Dict[str, IndexEntry]], List[tuple[int, str]], bool]:
+        """Index `top` and everything below it; runs in a worker thread.
+
+        Each directory is watched before it is listed, so nothing created
+        after its listing is missed. Only the kernel watch is added here;
+        the returned (wd, directory) pairs are recorded by register_watches
+        on the event loop. Returns (dirs, watches, whether a watch failed).
+        """
+        inotify = self.inotify
+        dirs: Dict[str, Dict[str, IndexEntry]] = {}
+        watched: List[tuple[int, str]] = []
+        watch_failed = False
+        stack = [top]
+        while stack:
+            directory = stack.pop()
+            if inotify is not None and not watch_failed:
+                try:
+                    watched.append((inotify.add_watch(directory), directory))
+                except OSError:
+                    # Out of watches (or closed); the index switches to polling
+                    watch_failed = True
+            children = {}
+            try:
+                with os.scandir(directory) as it:
+                    for dir_entry in it:
+                        try:
+                            is_link = dir_entry.is_symlink()
+                            try:
+                                stat = dir_entry.stat()
+                            except OSError:
+                                stat = dir_entry.stat(follow_symlinks=False)
+                        except OSError:
+                            continue
+                        entry = IndexEntry.from_stat(dir_entry.path, is_link, stat)
+                        children[entry.name] = entry
+                        if entry.is_dir(follow_symlinks=False) and entry.name not in INDEX_EXCLUDED_DIRS:
+                            stack.append(entry.path)
+            except OSError:
+                continue
+            dirs[directory] = children
+        return dirs, watched, watch_failed
+
+    def register_watches(self, watched: List[tuple[int, str]], watch_failed: bool) -> None:
+        if watch_failed:
+            self.watch_failed = True
+        if self.inotify is None:
+            return
+        for wd, directory in watched:
+            self.watches[wd] = directory
+            self.watched_paths[directory] = wd
+
+    def build(self) -> tuple[Dict[str, Dict[str, IndexEntry]], List[tuple[int, str]], bool]:
+        start = time.perf_counter()
+        result = self.scan_tree(self.root)
+        self.build_time = time.perf_counter() - start
+        return result
+
+    async def rebuild(self) -> None:
+        """Rescan the whole tree and swap it in.
+
+        Only called from the maintenance task. Events that arrive during the
+        scan stay queued and are replayed against the new tree afterwards.
+        """
+        dirs, watched, watch_failed = await asyncio.to_thread(self.build)
+        self.dirs = dirs
+        self.register_watches(watched, watch_failed)
+        self.ready = True
+        self.built_at = time.time()
+        if self.watch_failed:
+            self.disable_inotify()
+        if self.persist_path:
+            await asyncio.to_thread(self.save)
+
+    def schedule(self, rebuild: bool = False) -> asyncio.Task:
+        """Start the maintenance task unless it is already running."""
+        if rebuild:
+            self.dirty = True
+        if self.task is None or self.task.done():
+            self.task = asyncio.get_running_loop().create_task(self.maintain())
+        return self.task
+
+    async def maintain(self) -> None:
+        """Apply queued events and requested rebuilds, one at a time."""
+        while self.dirty or self.queue:
+            if self.dirty:
+                self.dirty = False
+                # The rescan sees everything queued so far
+                self.queue.clear()
+                try:
+                    await self.rebuild()
+                except Exception:
+                    if not self.ready:
+                        raise
+                continue
+            wd, mask, name = self.queue.popleft()
+            await self.apply_event(wd, mask, name)
+
+    async def start(self) -> None:
+        try:
+            self.inotify = Inotify()
+            asyncio.get_running_loop().add_reader(self.inotify.fd, self.on_events)
+            self.mode = "inotify"
+        except (OSError, AttributeError, NotImplementedError):
+            self.inotify = None
+        
+        task = self.schedule(rebuild=True)
+        if self.persist_path and os.path.exists(self.persist_path) and await asyncio.to_thread(self.load):
+            # Serve the saved snapshot while the fresh scan runs
+            self.ready = True
+        else:
+            await task
+        
+        if self.inotify is None and self.poll_task is None:
+            self.poll_task = asyncio.create_task(self.poll())
+
+    async def poll(self) -> None:
+        while True:
+            await asyncio.sleep(INDEX_RESCAN_INTERVAL)
+            try:
+                await self.schedule(rebuild=True)
+            except Exception:
+                continue
+
+    def disable_inotify(self) -> None:
+        if self.inotify is None:
+            return
+        asyncio.get_running_loop().remove_reader(self.inotify.fd)
+        self.inotify.close()
+        self.inotify = None
+        self.watches.clear()
+        self.watched_paths.clear()
+        self.mode = "polling"
+        if self.poll_task is None:
+            self.poll_task = asyncio.create_task(self.poll())
+
+    async def stop(self) -> None:
+        for task in (self.poll_task, self.task):
+            if task is not None:
+                task.cancel()
+        self.poll_task = self.task = None
+        if self.inotify is not None:
+            asyncio.get_running_loop().remove_reader(self.inotify.fd)
+            self.inotify.close()
+            self.inotify = None
+        if self.persist_path and self.ready:
+            await asyncio.to_thread(self.save)
+
+    def on_events(self) -> None:
+        if self.inotify is None:
+            return
+        events = self.inotify.read_events()
+        if not events:
+            return
+        self.events += len(events)
+        if any(mask & Inotify.IN_Q_OVERFLOW for _, mask, _ in events):
+            # Events were lost; only a full rescan can catch up
+            self.schedule(rebuild=True)
+            return
+        self.queue.extend(events)
+        self.schedule()
+
+    async def apply_event(self, wd: int, mask: int, name: str) -> None:
+        if mask & Inotify.IN_IGNORED:
+            directory = self.watches.pop(wd, None)
+            if directory is not None and self.watched_paths.get(directory) == wd:
+                del self.watched_paths[directory]
+            return
+        directory = self.watches.get(wd)
+        if directory is not None and name:
+            await self.refresh(os.path.join(directory, name))
+        if self.watch_failed:
+            self.disable_inotify()
+
+    async def refresh(self, path: str) -> None:
+        """Bring one path (and, for new directories, its subtree) up to date."""
+        parent, name = os.path.split(path)
+        children = self.dirs.get(parent)
+        if children is None:
+            return
+        
+        entry = stat_entry(path)
+        if entry is None:
+            children.pop(name, None)
+            self.drop_tree(path)
+            return
+        
+        children[name] = entry
+        if entry.is_dir(follow_symlinks=False):
+            if name not in INDEX_EXCLUDED_DIRS and path not in self.dirs:
+                dirs, watched, watch_failed = await asyncio.to_thread(self.scan_tree, path)
+                self.register_watches(watched, watch_failed)
+                if self.dirs.get(parent) is children:
+                    self.dirs.update(dirs)
+        elif path in self.dirs:
+            self.drop_tree(path)
+
+    def drop_tree(self, top: str) -> None:
+        stack = [top]
+        while stack:
+            directory = stack.pop()
+            children = self.dirs.pop(directory, None)
+            wd = self.watched_paths.pop(directory, None)
+            if wd is not None and self.inotify is not None:
+                self.watches.pop(wd, None)
+                self.inotify.rm_watch(wd)
+            if children:
+                stack.extend(c.path for c in children.values() if c.is_dir(follow_symlinks=False))
+
+    def save(self) -> None:
+        """Write the index to persist_path (atomically, via rename)."""
+        dirs = self.dirs
+        snapshot = {
+            'root': self.root,
+            'built_at': self.built_at,
+            'dirs': {directory: [entry.row() for entry in list(children.values())]
+                     for directory, children in list(dirs.items())}
+        }
+        temp_path = f"{self.persist_path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(snapshot, f)
+        os.replace(temp_path, self.persist_path)
+
+    def load(self) -> bool:
+        try:
+            with open(self.persist_path, 'r', encoding='utf-8') as f:
+                snapshot = json.load(f)
+            if snapshot.get('root') != self.root:
+                return False
+            self.dirs = {
+                directory: {row[0]: IndexEntry(os.path.join(directory, row[0]), *row) for row in rows}
+                for directory, rows in snapshot['dirs'].items()
+            }
+            self.built_at = snapshot.get('built_at', 0.0)
+            return True
+        except Exception:
+            return False
+
+    def entry_count(self) -> int:
+        return sum(len(children) for children in list(self.dirs.values()))
+
+# Active indexes by absolute root path
+_indexes: Dict[str, FileIndex] = {}
+
+def find_index(path: str) -> FileIndex | None:
+    """Return a ready index covering `path`, if any."""
+    if not _indexes:
+        return None
+    absolute = os.path.abspath(path)
+    for root, index in _indexes.items():
+        if index.ready and (absolute == root or absolute.startswith(root.rstrip(os.sep) + os.sep)):
+            return index
+    return None
+
+@mcp.tool()
+async def list_directory(
+    directory_path: str = ".",
+    show_hidden: bool = False,
+    pattern: str = "",
+    recursive: bool = False,
+    max_depth: int = 0,
+    cursor: str = "",
+    limit: int = DEFAULT_PAGE_SIZE,
+    output_format: str = "text"
+) -> str:
     """List the contents of a directory.
     
     Args:
         directory_path: Path to the directory (default: current directory)
         show_hidden: Whether to show hidden files (default: False)
+        pattern: Glob pattern entry names must match, e.g. "*.py" (default: all)
+        recursive: Whether to walk subdirectories (default: False)
+        max_depth: Maximum depth when recursive, 0 for unlimited (default: 0)
+        cursor: Cursor returned by a previous call to fetch the next page (default: first page)
+        limit: Maximum number of entries per page (default: 1000)
+        output_format: "text" for a table or "json" for structured output (default: text)
     """
     if not is_safe_path(directory_path):
         return f"Error: Unsafe directory path: {directory_path}"
     
+    if output_format not in ('text', 'json'):
+        return f"Error: Unknown output format: {output_format}"
+    
     path = Path(directory_path)
     if not path.exists():
         return f"Error: Directory does not exist: {directory_path}"
@@ -193,28 +1385,251 @@ async def list_directory(directory_path: str = ".", show_hidden: bool = False) -
     if not path.is_dir():
         return f"Error: Path is not a directory: {directory_path}"
     
+    index = find_index(str(path))
+    directory = os.path.abspath(path) if index else str(path)
+    lister = index.list_sorted if index else scandir_sorted
     try:
-        items = []
-        for item in sorted(path.iterdir()):
-            if not show_hidden and item.name.startswith('.'):
-                continue
-            
-            try:
-                stat = item.stat()
-                size = stat.st_size if item.is_file() else 0
-                item_type = "FILE" if item.is_file() else "DIR "
-                items.append(f"{item_type} {item.name:<40} {size:>10,} bytes")
-            except Exception:
-                items.append(f"ERR  {item.name:<40} {'Access denied':>10}")
+        items, next_cursor = await asyncio.to_thread(
+            scan_directory, directory, show_hidden, pattern, recursive, max_depth, cursor, max(limit, 1), lister
+        )
+    except Exception as e:
+        return f"Error listing directory: {str(e)}"
+    
+    if output_format == 'json':
+        return json.dumps({
+            'directory': str(path.absolute()),
+            'entries': items,
+            'next_cursor': next_cursor
+        }, ensure_ascii=False)
+    
+    if not items:
+        if pattern:
+            return f"No entries matching '{pattern}' in: {directory_path}"
+        return f"Directory is empty: {directory_path}"
+    
+    lines = []
+    for item in items:
+        if item['type'] == 'error':
+            lines.append(f"ERR  {item['path']:<40} {'Access denied':>10}")
+        else:
+            item_type = "FILE" if item['type'] == 'file' else "DIR "
+            lines.append(f"{item_type} {item['path']:<40} {item['size']:>10,} bytes")
+    
+    header = f"Contents of: {path.absolute()}\n{'Type':<4} {'Name':<40} {'Size':>15}\n{'-' * 60}"
+    result = f"{header}\n" + "\n".join(lines)
+    if next_cursor:
+        result += f"\n\nMore entries available, next cursor: {next_cursor}"
+    return result
+
+def search_file(file_path: str, regex: re.Pattern, context_lines: int, max_matches: int) -> List[tuple[int, str, bool]]:
+    """Return (line number, line, is_match) rows for one file.
+
+    Binary files, files over MAX_FILE_SIZE and undecodable files yield no
+    rows. Matches are found with one finditer pass over the whole text and
+    line numbers are counted incrementally, so the file is never split into
+    lines.
+    """
+    try:
+        with open(file_path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size > MAX_FILE_SIZE:
+                return []
+            data = f.read()
+    except OSError:
+        return []
+    
+    if b'\0' in data[:BINARY_SNIFF_SIZE]:
+        return []
+    
+    try:
+        text = data.decode('utf-8')
+    except UnicodeDecodeError:
+        decoded = decode_bytes(data, detect_encoding(data))
+        if decoded is None:
+            return []
+        text = decoded[0]
+    
+    rows = {}
+    line_no = 1
+    counted_to = 0
+    position = 0
+    matches = 0
+    while matches < max_matches:
+        match = regex.search(text, position)
+        if match is None:
+            break
+        line_start = text.rfind('\n', 0, match.start()) + 1
+        line_end = text.find('\n', match.start())
+        if line_end < 0:
+            line_end = len(text)
+        line_no += text.count('\n', counted_to, line_start)
+        counted_to = line_start
         
-        if not items:
-            return f"Directory is empty: {directory_path}"
+        before = line_start
+        for offset in range(1, context_lines + 1):
+            if before == 0:
+                break
+            previous = text.rfind('\n', 0, before - 1) + 1
+            rows.setdefault(line_no - offset, (text[previous:before - 1], False))
+            before = previous
+        rows[line_no] = (text[line_start:line_end], True)
+        after = line_end
+        for offset in range(1, context_lines + 1):
+            if after + 1 >= len(text):
+                break
+            following = text.find('\n', after + 1)
+            if following < 0:
+                following = len(text)
+            rows.setdefault(line_no + offset, (text[after + 1:following], False))
+            after = following
         
-        header = f"Contents of: {path.absolute()}\n{'Type':<4} {'Name':<40} {'Size':>15}\n{'-' * 60}"
-        return f"{header}\n" + "\n".join(items)
+        matches += 1
+        position = line_end + 1
     
-    except Exception as e:
-        return f"Error listing directory: {str(e)}"
+    return [(number, line.rstrip('\r'), is_match) for number, (line, is_match) in sorted(rows.items())]
+
+def search_batch(paths: List[str], regex: re.Pattern, context_lines: int, max_matches: int) -> List[tuple[str, List[tuple[int, str, bool]]]]:
+    results = []
+    for file_path in paths:
+        rows = search_file(file_path, regex, context_lines, max_matches)
+        if rows:
+            results.append((file_path, rows))
+    return results
+
+def format_search_rows(rel_path: str, rows: List[tuple[int, str, bool]]) -> str:
+    """Format rows grep-style: path:line: for matches, path-line- for context."""
+    lines = []
+    previous = None
+    for line_no, line, is_match in rows:
+        if previous is not None and line_no != previous + 1:
+            lines.append("--")
+        separator = ":" if is_match else "-"
+        lines.append(f"{rel_path}{separator}{line_no}{separator} {line}")
+        previous = line_no
+    return "\n".join(lines)
+
+def candidate_files(
+    directory: str,
+    file_pattern: str = "",
+    show_hidden: bool = False,
+    lister: Callable[[str], List[Any]] = scandir_sorted
+) -> List[str]:
+    """Collect searchable files under a directory (allowed extensions only)."""
+    paths = []
+    for parts, entry in walk_sorted(directory, show_hidden, recursive=True, lister=lister):
+        if isinstance(entry, OSError):
+            continue
+        if not is_allowed_file(entry.name):
+            continue
+        if file_pattern and not fnmatch.fnmatch(entry.name, file_pattern):
+            continue
+        try:
+            if entry.is_file():
+                paths.append(entry.path)
+        except OSError:
+            continue
+    return paths
+
+@mcp.tool()
+async def search_files(
+    pattern: str,
+    directory_path: str = ".",
+    file_pattern: str = "",
+    case_sensitive: bool = True,
+    context_lines: int = 0,
+    max_results: int = 200,
+    show_hidden: bool = False,
+    ctx: Context = None
+) -> str:
+    """Search file contents under a directory with a regular expression.
+    
+    Only files with allowed extensions and within the size limit are
+    searched; binary files are skipped. Matching files are streamed as
+    progress notifications while the search runs.
+    
+    Args:
+        pattern: Regular expression to search for
+        directory_path: Directory to search recursively (default: current directory)
+        file_pattern: Glob pattern file names must match, e.g. "*.py" (default: all allowed files)
+        case_sensitive: Whether matching is case sensitive (default: True)
+        context_lines: Lines of context to show around each match (default: 0)
+        max_results: Maximum number of matching lines to return (default: 200)
+        show_hidden: Whether to search hidden files and directories (default: False)
+    """
+    if not is_safe_path(directory_path):
+        return f"Error: Unsafe directory path: {directory_path}"
+    
+    path = Path(directory_path)
+    if not path.is_dir():
+        return f"Error: Directory does not exist or is not a directory: {directory_path}"
+    
+    try:
+        regex = re.compile(pattern, re.MULTILINE if case_sensitive else re.MULTILINE | re.IGNORECASE)
+    except re.error as e:
+        return f"Error: Invalid regular expression: {str(e)}"
+    
+    start = time.perf_counter()
+    index = find_index(str(path))
+    root = os.path.abspath(path) if index else str(path)
+    lister = index.list_sorted if index else scandir_sorted
+    paths = await asyncio.to_thread(candidate_files, root, file_pattern, show_hidden, lister)
+    
+    loop = asyncio.get_running_loop()
+    context_lines = max(context_lines, 0)
+    max_results = max(max_results, 1)
+    tasks = [
+        loop.run_in_executor(
+            _search_executor, search_batch,
+            paths[i:i + SEARCH_BATCH_SIZE], regex, context_lines, max_results
+        )
+        for i in range(0, len(paths), SEARCH_BATCH_SIZE)
+    ]
+    
+    found = []
+    match_count = 0
+    files_done = 0
+    try:
+        for next_batch in asyncio.as_completed(tasks):
+            batch = await next_batch
+            files_done += SEARCH_BATCH_SIZE
+            for file_path, rows in batch:
+                rel_path = os.path.relpath(file_path, root)
+                found.append((rel_path, rows))
+                match_count += sum(1 for row in rows if row[2])
+                if ctx is not None:
+                    await ctx.report_progress(
+                        min(files_done, len(paths)), len(paths),
+                        message=format_search_rows(rel_path, rows)
+                    )
+            if match_count >= max_results:
+                break
+    finally:
+        for task in tasks:
+            task.cancel()
+    
+    elapsed = time.perf_counter() - start
+    if not found:
+        return f"No matches for '{pattern}' in {len(paths):,} files under: {directory_path} ({elapsed:.2f}s)"
+    
+    blocks = []
+    remaining = max_results
+    for rel_path, rows in sorted(found):
+        kept = []
+        for row in rows:
+            if row[2]:
+                if remaining == 0:
+                    break
+                remaining -= 1
+            kept.append(row)
+        if kept:
+            blocks.append(format_search_rows(rel_path, kept))
+        if remaining == 0:
+            break
+    
+    summary = f"Matches for '{pattern}' in {directory_path} ({len(paths):,} files searched, {elapsed:.2f}s)"
+    if match_count >= max_results:
+        summary += f"\nResults truncated at {max_results} matching lines"
+    separator = "\n--\n" if context_lines else "\n"
+    return f"{summary}\n\n" + separator.join(blocks)
 
 @mcp.tool()
 async def get_file_info(file_path: str) -> str:
@@ -227,24 +1642,30 @@ async def get_file_info(file_path: str) -> str:
         return f"Error: Unsafe path: {file_path}"
     
     path = Path(file_path)
-    if not path.exists():
-        return f"Error: Path does not exist: {file_path}"
+    index = find_index(file_path)
+    stat = index.lookup(os.path.abspath(path)) if index else None
+    if stat is None:
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return f"Error: Path does not exist: {file_path}"
+        except Exception as e:
+            return f"Error getting file info: {str(e)}"
     
     try:
-        stat = path.stat()
-        import time
+        is_file = S_ISREG(stat.st_mode)
         
         info_lines = [
             f"Path: {path.absolute()}",
             f"Name: {path.name}",
-            f"Type: {'File' if path.is_file() else 'Directory'}",
-            f"Size: {stat.st_size:,} bytes" if path.is_file() else "Size: N/A (directory)",
+            f"Type: {'File' if is_file else 'Directory'}",
+            f"Size: {stat.st_size:,} bytes" if is_file else "Size: N/A (directory)",
             f"Created: {time.ctime(stat.st_ctime)}",
             f"Modified: {time.ctime(stat.st_mtime)}",
             f"Accessed: {time.ctime(stat.st_atime)}",
         ]
         
-        if path.is_file():
+        if is_file:
             info_lines.extend([
                 f"Extension: {path.suffix or 'None'}",
                 f"Readable: {os.access(path, os.R_OK)}",
@@ -258,13 +1679,20 @@ async def get_file_info(file_path: str) -> str:
         return f"Error getting file info: {str(e)}"
 
 @mcp.tool()
-async def execute_command(command: str, working_directory: str = ".", timeout: int = 30) -> str:
+async def execute_command(
+    command: str,
+    working_directory: str = ".",
+    timeout: int = 30,
+    stream: bool = False,
+    ctx: Context = None
+) -> str:
     """Execute a system command safely.
     
     Args:
         command: Command to execute
         working_directory: Working directory for the command (default: current directory)
         timeout: Timeout in seconds (default: 30)
+        stream: Send output chunks as progress notifications while the command runs (default: False)
     """
     if not is_safe_command(command):
         return f"Error: Command not allowed for security reasons: {command.split()[0] if command.split() else 'empty'}"
@@ -276,7 +1704,22 @@ async def execute_command(command: str, working_directory: str = ".", timeout: i
     if not work_dir.exists() or not work_dir.is_dir():
         return f"Error: Working directory does not exist or is not a directory: {working_directory}"
     
-    result = await execute_system_command(command, str(work_dir.absolute()), timeout)
+    on_output = None
+    if stream and ctx is not None:
+        decoders = {
+            name: codecs.getincrementaldecoder('utf-8')(errors='replace')
+            for name in ('stdout', 'stderr')
+        }
+        bytes_seen = 0
+        
+        async def on_output(name: str, chunk: bytes) -> None:
+            nonlocal bytes_seen
+            bytes_seen += len(chunk)
+            text = decoders[name].decode(chunk)
+            if text:
+                await ctx.report_progress(bytes_seen, message=f"[{name}] {text}")
+    
+    result = await execute_system_command(command, str(work_dir.absolute()), timeout, on_output)
     
     output_lines = [
         f"Command: {command}",
@@ -284,15 +1727,22 @@ async def execute_command(command: str, working_directory: str = ".", timeout: i
         f"Return Code: {result.get('returncode', 'N/A')}",
     ]
     
+    if 'wall_time' in result:
+        output_lines.append(f"Wall Time: {result['wall_time']:.3f}s")
+        output_lines.append(f"CPU Time: {result['cpu_time']:.3f}s")
+    
     if not result['success']:
         output_lines.append(f"Error: {result.get('error', 'Unknown error')}")
-        return "\n".join(output_lines)
     
     if result.get('stdout'):
-        output_lines.append(f"\nStandard Output:\n{result['stdout']}")
+        dropped = result['stdout_dropped']
+        note = f" ({dropped:,} bytes dropped from the middle)" if dropped else ""
+        output_lines.append(f"\nStandard Output{note}:\n{result['stdout']}")
     
     if result.get('stderr'):
-        output_lines.append(f"\nError Output:\n{result['stderr']}")
+        dropped = result['stderr_dropped']
+        note = f" ({dropped:,} bytes dropped from the middle)" if dropped else ""
+        output_lines.append(f"\nError Output{note}:\n{result['stderr']}")
     
     return "\n".join(output_lines)
 
@@ -305,6 +1755,100 @@ async def get_current_directory() -> str:
     except Exception as e:
         return f"Error getting current directory: {str(e)}"
 
+@mcp.tool()
+async def get_cache_stats() -> str:
+    """Get hit/miss counters and memory usage of the file content cache.
+    """
+    cache = _content_cache
+    lookups = cache.hits + cache.misses
+    hit_rate = cache.hits / lookups * 100 if lookups else 0.0
+    return "\n".join([
+        "Content Cache:",
+        f"  Entries: {len(cache.entries)}",
+        f"  Memory: {cache.used:,} / {cache.budget:,} bytes",
+        f"  Hits: {cache.hits:,}",
+        f"  Misses: {cache.misses:,}",
+        f"  Hit Rate: {hit_rate:.1f}%",
+        f"Encoding Cache Entries: {len(_encoding_cache)}",
+    ])
+
+@mcp.tool()
+async def start_index(directory_path: str = ".", persist_path: str = "") -> str:
+    """Build a background metadata index of a directory tree.
+    
+    While the index is live, list_directory, get_file_info and search_files
+    answer from memory for paths under it. It is kept current with inotify
+    on Linux and by periodic rescans elsewhere.
+    
+    Args:
+        directory_path: Root of the tree to index (default: current directory)
+        persist_path: Optional JSON file to save the index to and load it from on the next start
+    """
+    if not is_safe_path(directory_path):
+        return f"Error: Unsafe directory path: {directory_path}"
+    
+    if persist_path and not is_safe_path(persist_path):
+        return f"Error: Unsafe persist path: {persist_path}"
+    
+    root = os.path.abspath(directory_path)
+    if not os.path.isdir(root):
+        return f"Error: Directory does not exist or is not a directory: {directory_path}"
+    
+    if root in _indexes:
+        return f"Index already running for: {root}"
+    
+    index = FileIndex(root, os.path.abspath(persist_path) if persist_path else "")
+    _indexes[root] = index
+    try:
+        await index.start()
+    except Exception as e:
+        _indexes.pop(root, None)
+        await index.stop()
+        return f"Error building index: {str(e)}"
+    
+    return (
+        f"Indexed {index.entry_count():,} entries in {len(index.dirs):,} directories under {root} "
+        f"in {index.build_time:.2f}s (updates: {index.mode})"
+    )
+
+@mcp.tool()
+async def stop_index(directory_path: str = ".") -> str:
+    """Stop the background index for a directory tree.
+    
+    Args:
+        directory_path: Root the index was started with (default: current directory)
+    """
+    root = os.path.abspath(directory_path)
+    index = _indexes.pop(root, None)
+    if index is None:
+        return f"No index running for: {root}"
+    
+    try:
+        await index.stop()
+    except Exception as e:
+        return f"Index stopped, but saving it failed: {str(e)}"
+    return f"Stopped index for: {root}"
+
+@mcp.tool()
+async def get_index_status() -> str:
+    """Get the state of all background file indexes.
+    """
+    if not _indexes:
+        return "No indexes running"
+    
+    lines = []
+    for root, index in _indexes.items():
+        built = time.ctime(index.built_at) if index.built_at else "never"
+        lines.extend([
+            f"Index: {root}",
+            f"  Ready: {index.ready}",
+            f"  Updates: {index.mode} ({len(index.watches):,} watches, {index.events:,} events)",
+            f"  Entries: {index.entry_count():,} in {len(index.dirs):,} directories",
+            f"  Last Full Scan: {built} ({index.build_time:.2f}s)",
+            f"  Persisted To: {index.persist_path or 'memory only'}",
+        ])
+    return "\n".join(lines)
+
 @mcp.tool()
 async def create_directory(directory_path: str) -> str:
     """Create a new directory (including parent directories if needed).
@@ -1,34 +1,573 @@
 import os
+import base64
+import bisect
+import heapq
+import itertools
+import json
+import mmap
+import re
+import signal
+import stat
+import struct
 import subprocess
-from typing import Any, Optional
+import tempfile
+import threading
+import zlib
+from array import array
+from collections import OrderedDict, deque
+from contextlib import aclosing, asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Any, AsyncIterator, Dict, Iterator, Optional
 import asyncio
+import time
 from mcp.server.fastmcp import FastMCP
 
 # Initialize FastMCP server
 mcp = FastMCP("git-operations")
 
-async def run_git_command(repo_path: str, command: list[str]) -> tuple[str, str]:
-    """Run a git command in the specified repository directory."""
-    if not os.path.exists(repo_path):
-        return "", f"Repository path does not exist: {repo_path}"
+# Constants
+MAX_CONCURRENT_GIT = 8
+MAX_CONCURRENT_GIT_PER_REPO = 4
+GIT_COMMAND_TIMEOUT = 60  # seconds
+SUMMARY_CACHE_TTL = 300  # seconds
+SUMMARY_CACHE_SIZE = 64
+APPROX_COUNT_LIMIT = 10000
+COUNT_MODES = ('exact', 'cached', 'approximate')
+HISTORY_CACHE_SIZE = 256
+LOG_FORMAT = '%H%x1f%h%x1f%ai%x1f%an%x1f%s'  # fields of parse_log_record
+TEXT_INDEX_FILE = 'mcp-text-index.json'  # kept inside the repository's common git directory
+GIT_BACKENDS = ('git', 'native')
+PACK_OBJECT_TYPES = {1: 'commit', 2: 'tree', 3: 'blob', 4: 'tag'}
+NATIVE_BASE_CACHE_SIZE = 256  # resolved delta bases kept per repository
+NATIVE_COMMIT_CACHE_SIZE = 4096  # parsed commits kept per repository
+TEXT_INDEX_TIMEOUT = 600  # seconds one text index scan may run before git is killed
+TEXT_INDEX_WAIT = 1.0  # seconds a search waits for an index update before using the live pickaxe
+STREAM_LINE_LIMIT = 16 * 1024 * 1024  # longest output line stream_git_lines accepts, in bytes
+
+def kill_process_group(process: asyncio.subprocess.Process) -> None:
+    """SIGKILL a git started in its own session and everything it spawned.
+
+    Unlike Process.kill() this doesn't poll the child, which could reap a
+    git that just exited before asyncio's child watcher sees it.
+    """
+    if process.returncode is None:
+        try:
+            if os.name == 'posix':
+                os.killpg(process.pid, signal.SIGKILL)
+            else:
+                process.kill()
+        except (ProcessLookupError, PermissionError):
+            pass
+
+class GitCommandPool:
+    """Concurrency limits, timeouts and metrics for git subprocesses.
+
+    A command first waits for one of its repository's slots, then for a
+    global slot. Identical commands that are already running share that
+    run's result instead of starting another git (every command this server
+    runs is read-only). Each git gets its own process group so that a
+    timeout also kills anything it spawned.
+    """
+
+    def __init__(self, max_concurrent: int, max_per_repo: int):
+        self.slots = asyncio.Semaphore(max_concurrent)
+        self.max_per_repo = max_per_repo
+        self.repo_slots: Dict[str, asyncio.Semaphore] = {}
+        self.in_flight: Dict[tuple, asyncio.Task] = {}
+        self.waiters: Dict[asyncio.Task, int] = {}
+        self.commands = 0
+        self.deduplicated = 0
+        self.timeouts = 0
+        self.waiting = 0
+        self.running = 0
+        self.queue_wait_total = 0.0
+        self.queue_wait_max = 0.0
+        self.exec_total = 0.0
+        self.exec_max = 0.0
+
+    @asynccontextmanager
+    async def slot(self, repo_path: str) -> AsyncIterator[None]:
+        """Hold a repository slot and a global slot, timing the wait and the run."""
+        repo_slots = self.repo_slots.setdefault(repo_path, asyncio.Semaphore(self.max_per_repo))
+        queued = time.perf_counter()
+        self.waiting += 1
+        acquired = False
+        try:
+            async with repo_slots, self.slots:
+                self.waiting -= 1
+                acquired = True
+                started = time.perf_counter()
+                self.queue_wait_total += started - queued
+                self.queue_wait_max = max(self.queue_wait_max, started - queued)
+                self.commands += 1
+                self.running += 1
+                try:
+                    yield
+                finally:
+                    self.running -= 1
+                    elapsed = time.perf_counter() - started
+                    self.exec_total += elapsed
+                    self.exec_max = max(self.exec_max, elapsed)
+        finally:
+            if not acquired:
+                self.waiting -= 1
+
+    async def spawn(self, cwd: str, command: list[str], stdin: int, limit: int = 2 ** 16) -> asyncio.subprocess.Process:
+        return await asyncio.create_subprocess_exec(
+            'git', *command,
+            cwd=cwd,
+            stdin=stdin,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            limit=limit,
+            env={**os.environ, 'LC_ALL': 'C.UTF-8'},
+            start_new_session=(os.name == 'posix')
+        )
+
+    async def run(self, repo_root: str, cwd: str, command: list[str], input: Optional[str], timeout: float) -> tuple[str, str]:
+        """Run a command, or join an identical one that is already running."""
+        key = (cwd, tuple(command), input)
+        task = self.in_flight.get(key)
+        if task is None:
+            task = asyncio.create_task(self.execute(repo_root, cwd, command, input, timeout))
+            self.in_flight[key] = task
+            task.add_done_callback(lambda done: self.in_flight.pop(key, None) if self.in_flight.get(key) is done else None)
+        else:
+            self.deduplicated += 1
+        # Shielded so one caller giving up doesn't cancel the run for the
+        # others; the run is cancelled once the last of them has given up
+        self.waiters[task] = self.waiters.get(task, 0) + 1
+        try:
+            return await asyncio.shield(task)
+        finally:
+            self.waiters[task] -= 1
+            if not self.waiters[task]:
+                del self.waiters[task]
+                task.cancel()
+
+    async def execute(self, repo_root: str, cwd: str, command: list[str], input: Optional[str], timeout: float) -> tuple[str, str]:
+        async with self.slot(repo_root):
+            try:
+                process = await self.spawn(
+                    cwd, command,
+                    asyncio.subprocess.PIPE if input is not None else asyncio.subprocess.DEVNULL
+                )
+            except Exception as e:
+                return "", f"Error running git command: {str(e)}"
+            try:
+                stdout, stderr = await asyncio.wait_for(
+                    process.communicate(input.encode('utf-8') if input is not None else None), timeout
+                )
+            except asyncio.TimeoutError:
+                self.timeouts += 1
+                return "", f"Git command timed out after {timeout:g}s: git {' '.join(command)}"
+            except Exception as e:
+                return "", f"Error running git command: {str(e)}"
+            finally:
+                kill_process_group(process)
+                await process.wait()
+            return stdout.decode('utf-8', errors='replace'), stderr.decode('utf-8', errors='replace')
+
+_git_pool = GitCommandPool(MAX_CONCURRENT_GIT, MAX_CONCURRENT_GIT_PER_REPO)
+
+class GitRepository:
+    """Where a repository lives on disk, resolved once per input path.
+
+    `root` is the top of the working tree (the git dir itself for bare
+    repositories). `git_dir` holds this worktree's HEAD and `common_dir`
+    the objects and refs shared by all worktrees; they are the same
+    directory outside linked worktrees.
+    """
+
+    def __init__(self, root: str, git_dir: str, common_dir: str, object_format: str):
+        self.root = root
+        self.git_dir = git_dir
+        self.common_dir = common_dir
+        self.object_format = object_format
+
+    def ref_state(self) -> tuple:
+        return ref_state(self.git_dir, self.common_dir)
+
+def is_git_dir(path: str) -> bool:
+    return os.path.isfile(os.path.join(path, 'HEAD')) and (
+        os.path.isfile(os.path.join(path, 'commondir'))
+        or (os.path.isdir(os.path.join(path, 'objects')) and os.path.isdir(os.path.join(path, 'refs')))
+    )
+
+def discover_repository(path: str) -> GitRepository:
+    """Find the repository containing `path` the way git does.
+
+    Walks up from `path` to the first directory with a .git directory, a
+    .git file pointing at a worktree's git dir, or that is itself a bare
+    repository. Raises RuntimeError if there is none.
+    """
+    if not os.path.exists(path):
+        raise RuntimeError(f"Repository path does not exist: {path}")
     
-    if not os.path.exists(os.path.join(repo_path, '.git')):
-        return "", f"Not a git repository: {repo_path}"
+    current = os.path.abspath(path)
+    if not os.path.isdir(current):
+        current = os.path.dirname(current)
+    while True:
+        dot_git = os.path.join(current, '.git')
+        git_dir = None
+        if os.path.isdir(dot_git):
+            git_dir = dot_git
+        elif os.path.isfile(dot_git):
+            try:
+                with open(dot_git, 'r', encoding='utf-8') as f:
+                    content = f.read().strip()
+            except OSError:
+                content = ""
+            if content.startswith('gitdir:'):
+                git_dir = os.path.normpath(os.path.join(current, content[len('gitdir:'):].strip()))
+        elif is_git_dir(current):
+            git_dir = current
+        
+        if git_dir is not None and is_git_dir(git_dir):
+            break
+        parent = os.path.dirname(current)
+        if parent == current:
+            raise RuntimeError(f"Not a git repository: {path}")
+        current = parent
     
+    common_dir = git_dir
     try:
-        # Run git command
-        process = await asyncio.create_subprocess_exec(
-            'git', *command,
-            cwd=repo_path,
+        with open(os.path.join(git_dir, 'commondir'), 'r', encoding='utf-8') as f:
+            common_dir = os.path.normpath(os.path.join(git_dir, f.read().strip()))
+    except OSError:
+        pass
+    
+    object_format = 'sha1'
+    try:
+        with open(os.path.join(common_dir, 'config'), 'r', encoding='utf-8', errors='replace') as f:
+            match = re.search(r'^\s*objectformat\s*=\s*(\S+)', f.read(), re.IGNORECASE | re.MULTILINE)
+        if match:
+            object_format = match.group(1).lower()
+    except OSError:
+        pass
+    
+    return GitRepository(current, git_dir, common_dir, object_format)
+
+# Resolved repositories by input path (any directory inside the working tree)
+_repositories: Dict[str, GitRepository] = {}
+
+def get_repository(repo_path: str) -> GitRepository:
+    """Return the repository for a path, discovering it on first use.
+
+    Raises RuntimeError if the path isn't inside a repository.
+    """
+    key = os.path.abspath(repo_path)
+    repo = _repositories.get(key)
+    if repo is None or not os.path.isdir(repo.git_dir):
+        repo = _repositories[key] = discover_repository(repo_path)
+    return repo
+
+def ref_state(git_dir: str, common_dir: str = "") -> tuple:
+    """Cheap fingerprint of a repository's refs.
+
+    Git updates loose refs by renaming a lock file into place, which bumps
+    the containing directory's mtime, so the mtimes of the refs directories
+    plus HEAD and packed-refs change whenever any ref moves. HEAD, its
+    reflog and refs/worktree etc. are per worktree; the rest lives in the
+    common dir.
+    """
+    common_dir = common_dir or git_dir
+    state = []
+    for directory, name in ((git_dir, 'HEAD'), (git_dir, os.path.join('logs', 'HEAD')), (common_dir, 'packed-refs')):
+        try:
+            info = os.stat(os.path.join(directory, name))
+            state.append((name, info.st_mtime_ns, info.st_size))
+        except OSError:
+            state.append((name, None, None))
+    
+    stack = [os.path.join(common_dir, 'refs'), os.path.join(common_dir, 'reftable')]
+    if git_dir != common_dir:
+        stack.append(os.path.join(git_dir, 'refs'))
+    while stack:
+        directory = stack.pop()
+        try:
+            state.append((directory, os.stat(directory).st_mtime_ns))
+            with os.scandir(directory) as it:
+                stack.extend(entry.path for entry in it if entry.is_dir(follow_symlinks=False))
+        except OSError:
+            continue
+    return tuple(state)
+
+async def run_git_command(
+    repo_path: str,
+    command: list[str],
+    input: Optional[str] = None,
+    timeout: float = GIT_COMMAND_TIMEOUT
+) -> tuple[str, str]:
+    """Run a git command in the specified repository directory.
+
+    `input`, if given, is written to the command's stdin (e.g. for --stdin).
+    """
+    try:
+        repo = get_repository(repo_path)
+    except RuntimeError as e:
+        return "", str(e)
+    
+    return await _git_pool.run(repo.root, os.path.abspath(repo_path), command, input, timeout)
+
+async def stream_git_lines(repo_path: str, command: list[str], timeout: float = GIT_COMMAND_TIMEOUT) -> AsyncIterator[str]:
+    """Yield a git command's stdout line by line as it is produced.
+
+    If the consumer stops early (use contextlib.aclosing), the process is
+    killed so the rest of the history is never walked. Raises RuntimeError
+    with git's stderr if the command fails or runs past `timeout`, or if a
+    line is longer than STREAM_LINE_LIMIT bytes.
+    
+    The pool slot is held for as long as git runs, which includes any time
+    git spends blocked on a consumer that isn't reading, so consumers must
+    not await other pooled git commands between lines: with every slot held
+    by such streams they would wait forever. Collect what you need and run
+    follow-up commands after the stream is closed.
+    """
+    repo = get_repository(repo_path)
+    started: asyncio.Future = asyncio.get_running_loop().create_future()
+    
+    async def hold_slot() -> None:
+        # Released as soon as git exits rather than when the consumer is done
+        # with the output that is already buffered
+        async with _git_pool.slot(repo.root):
+            try:
+                process = await _git_pool.spawn(repo_path, command, asyncio.subprocess.DEVNULL, STREAM_LINE_LIMIT)
+            except Exception as e:
+                started.set_exception(e)
+                return
+            started.set_result(process)
+            try:
+                await process.wait()
+            finally:
+                kill_process_group(process)
+    
+    holder = asyncio.create_task(hold_slot())
+    try:
+        process = await started
+    except BaseException:
+        holder.cancel()
+        raise
+    expired = []
+    
+    def expire() -> None:
+        expired.append(True)
+        kill_process_group(process)
+    
+    timer = asyncio.get_running_loop().call_later(timeout, expire)
+    stderr_task = asyncio.create_task(process.stderr.read())
+    try:
+        while True:
+            try:
+                raw_line = await process.stdout.readline()
+            except ValueError:
+                raise RuntimeError(
+                    f"Git output line longer than {STREAM_LINE_LIMIT} bytes: git {' '.join(command)}"
+                ) from None
+            if not raw_line:
+                break
+            yield raw_line.decode('utf-8', errors='replace').rstrip('\n')
+        await process.wait()
+        if expired:
+            _git_pool.timeouts += 1
+            raise RuntimeError(f"Git command timed out after {timeout:g}s: git {' '.join(command)}")
+        stderr = (await stderr_task).decode('utf-8', errors='replace')
+        if process.returncode != 0 or stderr:
+            raise RuntimeError(stderr.strip() or f"git exited with status {process.returncode}")
+    finally:
+        timer.cancel()
+        kill_process_group(process)
+        await process.wait()
+        await holder
+        stderr_task.cancel()
+
+def parse_object_header(header: bytes) -> Optional[list[str]]:
+    """The (oid, type, size) fields of a cat-file response header.
+
+    Returns None for "<name> missing" and "<name> ambiguous"; the name is
+    echoed back as given and may itself contain spaces.
+    """
+    line = header.rstrip(b'\n')
+    if line.endswith((b' missing', b' ambiguous')):
+        return None
+    parts = line.decode('utf-8', errors='replace').split()
+    if len(parts) != 3 or not parts[2].isdigit():
+        return None
+    return parts
+
+class CatFileProcess:
+    """A long-lived `git cat-file --batch` or `--batch-check` process.
+
+    Requests are pipelined: each caller writes its object name and waits on
+    a future, and a single reader task resolves the futures in order as the
+    responses come back. The process is (re)started on demand.
+    """
+
+    def __init__(self, repo_path: str, mode: str):
+        self.repo_path = repo_path
+        self.mode = mode
+        self.process: Optional[asyncio.subprocess.Process] = None
+        self.reader: Optional[asyncio.Task] = None
+        self.pending: deque = deque()
+        self.lock = asyncio.Lock()
+
+    async def start(self) -> None:
+        self.process = await asyncio.create_subprocess_exec(
+            'git', 'cat-file', f'--{self.mode}',
+            cwd=self.repo_path,
+            stdin=asyncio.subprocess.PIPE,
             stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
             env={**os.environ, 'LC_ALL': 'C.UTF-8'}
         )
-        stdout, stderr = await process.communicate()
-        
-        return stdout.decode('utf-8', errors='replace'), stderr.decode('utf-8', errors='replace')
-    except Exception as e:
-        return "", f"Error running git command: {str(e)}"
+        self.reader = asyncio.create_task(self.read_responses(self.process))
+
+    async def read_responses(self, process: asyncio.subprocess.Process) -> None:
+        try:
+            while True:
+                header = await process.stdout.readline()
+                if not header:
+                    break
+                parts = parse_object_header(header)
+                body = None
+                if self.mode == 'batch' and parts is not None:
+                    body = (await process.stdout.readexactly(int(parts[2]) + 1))[:-1]
+                future = self.pending.popleft()
+                if not future.done():
+                    future.set_result((parts, body))
+        except Exception:
+            pass
+        finally:
+            # The process went away: fail whatever is still waiting
+            while self.pending:
+                future = self.pending.popleft()
+                if not future.done():
+                    future.set_exception(RuntimeError("git cat-file process exited"))
+
+    async def request(self, spec: str) -> tuple[Optional[list[str]], Optional[bytes]]:
+        """Send one object name; returns (header fields, body), both None if it's missing."""
+        if '\n' in spec:
+            raise ValueError(f"Invalid object name: {spec!r}")
+        async with self.lock:
+            if self.process is None or self.process.returncode is not None or self.reader.done():
+                self.kill()
+                await self.start()
+            future = asyncio.get_running_loop().create_future()
+            self.pending.append(future)
+            self.process.stdin.write(spec.encode('utf-8') + b'\n')
+            await self.process.stdin.drain()
+        return await future
+
+    def close(self) -> None:
+        if self.process is not None and self.process.returncode is None:
+            self.process.stdin.close()
+
+    def kill(self) -> None:
+        """Stop a process whose reader has given up, before starting another."""
+        if self.process is not None and self.process.returncode is None:
+            try:
+                self.process.kill()
+            except ProcessLookupError:
+                pass
+
+class GitCatFile:
+    """Object lookups for one repository over persistent cat-file processes."""
+
+    def __init__(self, repo_path: str):
+        self.batch = CatFileProcess(repo_path, 'batch')
+        self.batch_check = CatFileProcess(repo_path, 'batch-check')
+
+    async def object_info(self, spec: str) -> Optional[tuple[str, str, int]]:
+        """Return (oid, type, size) for an object name, or None if missing."""
+        parts, _ = await self.batch_check.request(spec)
+        if parts is None:
+            return None
+        return parts[0], parts[1], int(parts[2])
+
+    async def read_object(self, spec: str) -> Optional[tuple[str, str, bytes]]:
+        """Return (oid, type, contents) for an object name, or None if missing."""
+        parts, body = await self.batch.request(spec)
+        if body is None:
+            return None
+        return parts[0], parts[1], body
+
+    async def read_commit(self, spec: str) -> Optional[Dict[str, Any]]:
+        obj = await self.read_object(spec)
+        if obj is None or obj[1] != 'commit':
+            return None
+        return parse_commit(obj[0], obj[2])
+
+    def close(self) -> None:
+        self.batch.close()
+        self.batch_check.close()
+
+# Persistent cat-file backends by repository root
+_cat_file_backends: Dict[str, GitCatFile] = {}
+
+def get_cat_file(repo_path: str) -> GitCatFile:
+    """Return the repository's cat-file backend; RuntimeError if it isn't a repository."""
+    root = get_repository(repo_path).root
+    backend = _cat_file_backends.get(root)
+    if backend is None:
+        backend = _cat_file_backends[root] = GitCatFile(root)
+    return backend
+
+def parse_commit(oid: str, data: bytes) -> Dict[str, Any]:
+    """Parse a raw commit object into its tree, parents, author and message."""
+    header, _, message = data.partition(b'\n\n')
+    commit = {'hash': oid, 'tree': '', 'parents': [], 'author': '', 'email': '',
+              'timestamp': 0, 'tz': '+0000', 'commit_time': 0, 'message': ''}
+    encoding = 'utf-8'
+    for line in header.split(b'\n'):
+        key, _, value = line.partition(b' ')
+        if key == b'tree':
+            commit['tree'] = value.decode('ascii')
+        elif key == b'parent':
+            commit['parents'].append(value.decode('ascii'))
+        elif key == b'author':
+            ident, timestamp, tz = value.decode('utf-8', errors='replace').rsplit(' ', 2)
+            name, _, email = ident.partition(' <')
+            commit.update(author=name, email=email.rstrip('>'), timestamp=int(timestamp), tz=tz)
+        elif key == b'committer':
+            commit['commit_time'] = int(value.rsplit(b' ', 2)[1])
+        elif key == b'encoding':
+            encoding = value.decode('ascii', errors='replace')
+    try:
+        commit['message'] = message.decode(encoding, errors='replace')
+    except LookupError:
+        commit['message'] = message.decode('utf-8', errors='replace')
+    return commit
+
+def commit_date(commit: Dict[str, Any]) -> str:
+    """Render the author date like git's %ai."""
+    tz = commit['tz']
+    sign = -1 if tz.startswith('-') else 1
+    offset = timedelta(hours=int(tz[1:3]), minutes=int(tz[3:5])) * sign
+    moment = datetime.fromtimestamp(commit['timestamp'], timezone(offset))
+    return f"{moment.strftime('%Y-%m-%d %H:%M:%S')} {tz}"
+
+def split_message(message: str) -> tuple[str, str]:
+    """Split a commit message into git's %s (first paragraph on one line) and %b."""
+    lines = message.split('\n')
+    i = 0
+    while i < len(lines) and not lines[i].strip():
+        i += 1
+    subject = []
+    while i < len(lines) and lines[i].strip():
+        subject.append(lines[i].rstrip())
+        i += 1
+    while i < len(lines) and not lines[i].strip():
+        i += 1
+    return ' '.join(subject), '\n'.join(lines[i:])
+
+def commit_line(commit: Dict[str, Any], short_hash: str = "") -> str:
+    """Render a parsed commit as a '%h|%ai|%an|%s' line for format_commit_info.
+
+    Pass the abbreviation git printed as `short_hash`, since git lengthens
+    it in large repositories.
+    """
+    subject = split_message(commit['message'])[0]
+    return f"{short_hash or commit['hash'][:7]}|{commit_date(commit)}|{commit['author']}|{subject}"
 
 def format_commit_info(commit_line: str) -> str:
     """Format a single commit line into readable format."""
@@ -41,82 +580,1165 @@ def format_commit_info(commit_line: str) -> str:
         return f"[{hash_short}] {date} - {author}\n  {message}"
     return commit_line
 
+class NativeUnsupported(Exception):
+    """The in-process reader can't answer this; use git instead."""
+
+def read_varint_size(data: bytes, pos: int) -> tuple[int, int]:
+    """Read a delta header size (little-endian base-128); returns (size, next position)."""
+    size = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        size |= (byte & 0x7f) << shift
+        shift += 7
+        if not byte & 0x80:
+            return size, pos
+
+def apply_delta(base: bytes, delta: bytes) -> bytes:
+    """Rebuild an object from its delta base and a pack delta."""
+    base_size, pos = read_varint_size(delta, 0)
+    result_size, pos = read_varint_size(delta, pos)
+    if base_size != len(base):
+        raise ValueError("Delta base size mismatch")
+    out = bytearray()
+    end = len(delta)
+    while pos < end:
+        op = delta[pos]
+        pos += 1
+        if op & 0x80:
+            # Copy from base: offset and size bytes are present per flag bit
+            offset = size = 0
+            for i in range(4):
+                if op & (1 << i):
+                    offset |= delta[pos] << (8 * i)
+                    pos += 1
+            for i in range(3):
+                if op & (0x10 << i):
+                    size |= delta[pos] << (8 * i)
+                    pos += 1
+            out += base[offset:offset + (size or 0x10000)]
+        elif op:
+            out += delta[pos:pos + op]
+            pos += op
+        else:
+            raise ValueError("Invalid delta opcode")
+    if len(out) != result_size:
+        raise ValueError("Delta result size mismatch")
+    return bytes(out)
+
+class PackFile:
+    """A memory-mapped .idx (version 2) and .pack pair."""
+
+    def __init__(self, idx_path: str):
+        with open(idx_path, 'rb') as f:
+            self.idx = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.idx[:8] != b'\377tOc\0\0\0\2':
+            raise NativeUnsupported(f"Unsupported pack index: {idx_path}")
+        with open(idx_path[:-4] + '.pack', 'rb') as f:
+            self.pack = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            info = os.fstat(f.fileno())
+        # Identifies this pack in caches across reopens, unlike id()
+        self.key = (idx_path, info.st_mtime_ns, info.st_size)
+        self.fanout = struct.unpack_from('>256I', self.idx, 8)
+        self.count = self.fanout[255]
+        self.names_start = 8 + 256 * 4
+        self.offsets_start = self.names_start + 24 * self.count  # names, then CRCs
+        self.large_offsets_start = self.offsets_start + 4 * self.count
+
+    def name(self, pos: int) -> bytes:
+        start = self.names_start + 20 * pos
+        return self.idx[start:start + 20]
+
+    def bisect(self, oid: bytes) -> int:
+        """Position of the first name >= oid."""
+        lo = self.fanout[oid[0] - 1] if oid[0] else 0
+        hi = self.fanout[oid[0]]
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.name(mid) < oid:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def find(self, oid: bytes) -> Optional[int]:
+        """Pack offset of an object, or None if it isn't in this pack."""
+        pos = self.bisect(oid)
+        if pos >= self.count or self.name(pos) != oid:
+            return None
+        offset = struct.unpack_from('>I', self.idx, self.offsets_start + 4 * pos)[0]
+        if offset & 0x80000000:
+            offset = struct.unpack_from('>Q', self.idx, self.large_offsets_start + 8 * (offset & 0x7fffffff))[0]
+        return offset
+
+    def header(self, offset: int) -> tuple[int, int, int, Any]:
+        """Return (type, size, data position, delta base) for the entry at `offset`.
+
+        The delta base is a pack offset for OFS_DELTA, an object name for
+        REF_DELTA and None otherwise.
+        """
+        data = self.pack
+        byte = data[offset]
+        pos = offset + 1
+        kind = (byte >> 4) & 7
+        size = byte & 0x0f
+        shift = 4
+        while byte & 0x80:
+            byte = data[pos]
+            pos += 1
+            size |= (byte & 0x7f) << shift
+            shift += 7
+        base = None
+        if kind == 6:
+            byte = data[pos]
+            pos += 1
+            distance = byte & 0x7f
+            while byte & 0x80:
+                byte = data[pos]
+                pos += 1
+                distance = ((distance + 1) << 7) | (byte & 0x7f)
+            base = offset - distance
+        elif kind == 7:
+            base = bytes(data[pos:pos + 20])
+            pos += 20
+        return kind, size, pos, base
+
+    def inflate(self, pos: int, size: int) -> bytes:
+        """Decompress one zlib stream starting at `pos` without copying the rest of the pack."""
+        decompressor = zlib.decompressobj()
+        parts = []
+        step = max(size + 64, 4096)
+        while not decompressor.eof:
+            block = self.pack[pos:pos + step]
+            if not block:
+                raise ValueError("Truncated pack entry")
+            parts.append(decompressor.decompress(block))
+            pos += step
+        data = b''.join(parts)
+        if len(data) != size:
+            raise ValueError("Pack entry size mismatch")
+        return data
+
+class CommitGraphFile:
+    """The commit-graph file: parents and commit times without inflating commits."""
+
+    def __init__(self, path: str):
+        with open(path, 'rb') as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        signature, version, hash_version, chunk_count = struct.unpack_from('>4sBBB', self.data, 0)
+        if signature != b'CGPH' or version != 1 or hash_version != 1:
+            raise NativeUnsupported(f"Unsupported commit-graph: {path}")
+        chunks = {}
+        for i in range(chunk_count):
+            chunk_id, offset = struct.unpack_from('>4sQ', self.data, 8 + 12 * i)
+            chunks[chunk_id] = offset
+        if not {b'OIDF', b'OIDL', b'CDAT'} <= chunks.keys():
+            raise NativeUnsupported(f"Incomplete commit-graph: {path}")
+        self.fanout = struct.unpack_from('>256I', self.data, chunks[b'OIDF'])
+        self.count = self.fanout[255]
+        self.names_start = chunks[b'OIDL']
+        self.commit_data_start = chunks[b'CDAT']
+        self.edges_start = chunks.get(b'EDGE')
+
+    def name(self, pos: int) -> bytes:
+        start = self.names_start + 20 * pos
+        return self.data[start:start + 20]
+
+    def find(self, oid: bytes) -> Optional[int]:
+        lo = self.fanout[oid[0] - 1] if oid[0] else 0
+        hi = self.fanout[oid[0]]
+        while lo < hi:
+            mid = (lo + hi) // 2
+            name = self.name(mid)
+            if name == oid:
+                return mid
+            if name < oid:
+                lo = mid + 1
+            else:
+                hi = mid
+        return None
+
+    def commit(self, pos: int) -> tuple[list[bytes], int]:
+        """Return (parent names, commit time) for the commit at `pos`."""
+        start = self.commit_data_start + 36 * pos
+        first, second, high, low = struct.unpack_from('>IIII', self.data, start + 20)
+        parents = []
+        if first != 0x70000000:
+            parents.append(self.name(first))
+        if second & 0x80000000:
+            # Octopus merge: the rest of the parents are listed in the EDGE chunk
+            edge = second & 0x7fffffff
+            while True:
+                value = struct.unpack_from('>I', self.data, self.edges_start + 4 * edge)[0]
+                parents.append(self.name(value & 0x7fffffff))
+                if value & 0x80000000:
+                    break
+                edge += 1
+        elif second != 0x70000000:
+            parents.append(self.name(second))
+        return parents, ((high & 0x3) << 32) | low
+
+class NativeRepository:
+    """Read-only, in-process access to a repository's refs and objects.
+
+    Loose objects, packfiles (memory-mapped, with delta chains resolved
+    through a small LRU of bases) and the commit-graph file are read
+    directly, so metadata queries don't have to start git. Layouts it
+    doesn't handle (reftable refs, SHA-256, split commit-graphs, alternates,
+    replace refs, grafts and shallow clones) raise NativeUnsupported and
+    callers fall back to git.
+    """
+
+    def __init__(self, repo: GitRepository):
+        self.repo = repo
+        if os.path.isdir(os.path.join(repo.common_dir, 'reftable')):
+            raise NativeUnsupported("Reftable refs are not supported")
+        if repo.object_format != 'sha1':
+            raise NativeUnsupported("Only SHA-1 repositories are supported")
+        self.objects_dir = os.path.join(repo.common_dir, 'objects')
+        if os.path.exists(os.path.join(self.objects_dir, 'info', 'alternates')):
+            raise NativeUnsupported("Alternate object stores are not supported")
+        self.lock = threading.Lock()
+        self.packs: list[PackFile] = []
+        self.packs_state = None
+        self.commit_graph: Optional[CommitGraphFile] = None
+        self.commit_graph_state = None
+        self.bases: "OrderedDict[tuple[tuple, int], tuple[str, bytes]]" = OrderedDict()
+        self.commits: "OrderedDict[bytes, Dict[str, Any]]" = OrderedDict()
+        self.refs_cache: Optional[tuple[tuple, Dict[str, bytes]]] = None
+
+    def refresh(self) -> None:
+        """Reopen the packs and commit-graph if they changed (fetch, gc, repack).
+
+        Called once per query; replaced maps are left for the garbage
+        collector since other threads may still be reading them. Raises
+        NativeUnsupported if history is rewritten by replace refs, grafts or
+        a shallow clone, which git applies when walking but this reader
+        doesn't.
+        """
+        if any(os.path.exists(os.path.join(self.repo.common_dir, name)) for name in (os.path.join('info', 'grafts'), 'shallow')):
+            raise NativeUnsupported("Grafted and shallow histories are not supported")
+        if any(refname.startswith('refs/replace/') for refname in self.refs()):
+            raise NativeUnsupported("Replace refs are not supported")
+        
+        pack_dir = os.path.join(self.objects_dir, 'pack')
+        graph_path = os.path.join(self.objects_dir, 'info', 'commit-graph')
+        try:
+            packs_state = os.stat(pack_dir).st_mtime_ns
+        except OSError:
+            packs_state = None
+        try:
+            graph_stat = os.stat(graph_path)
+            graph_state = (graph_stat.st_mtime_ns, graph_stat.st_size)
+        except OSError:
+            graph_state = None
+        
+        with self.lock:
+            if packs_state != self.packs_state:
+                packs = []
+                if packs_state is not None:
+                    for name in sorted(os.listdir(pack_dir)):
+                        if name.endswith('.idx') and os.path.exists(os.path.join(pack_dir, name[:-4] + '.pack')):
+                            packs.append(PackFile(os.path.join(pack_dir, name)))
+                self.packs = packs
+                self.bases.clear()
+                self.packs_state = packs_state
+            if graph_state != self.commit_graph_state:
+                self.commit_graph = None
+                if graph_state is not None:
+                    try:
+                        self.commit_graph = CommitGraphFile(graph_path)
+                    except (NativeUnsupported, ValueError, struct.error):
+                        self.commit_graph = None
+                self.commit_graph_state = graph_state
+
+    def read_loose(self, oid: bytes) -> Optional[tuple[str, bytes]]:
+        name = oid.hex()
+        try:
+            with open(os.path.join(self.objects_dir, name[:2], name[2:]), 'rb') as f:
+                raw = zlib.decompress(f.read())
+        except FileNotFoundError:
+            return None
+        header, _, data = raw.partition(b'\0')
+        kind, _, size = header.decode('ascii').partition(' ')
+        if int(size) != len(data):
+            raise ValueError(f"Corrupt loose object: {name}")
+        return kind, data
+
+    def read_packed(self, pack: PackFile, offset: int) -> tuple[str, bytes]:
+        """Read a pack entry, resolving its delta chain from the nearest cached base."""
+        chain = []
+        while True:
+            with self.lock:
+                cached = self.bases.get((pack.key, offset))
+                if cached is not None:
+                    self.bases.move_to_end((pack.key, offset))
+            if cached is not None:
+                kind, data = cached
+                break
+            entry_kind, size, pos, base = pack.header(offset)
+            if entry_kind == 6:
+                chain.append((pack, offset, pack.inflate(pos, size)))
+                offset = base
+            elif entry_kind == 7:
+                chain.append((pack, offset, pack.inflate(pos, size)))
+                located = self.locate(base)
+                if located is None:
+                    loose = self.read_loose(base)
+                    if loose is None:
+                        raise ValueError(f"Missing delta base: {base.hex()}")
+                    kind, data = loose
+                    break
+                pack, offset = located
+            elif entry_kind in PACK_OBJECT_TYPES:
+                kind, data = PACK_OBJECT_TYPES[entry_kind], pack.inflate(pos, size)
+                break
+            else:
+                raise ValueError(f"Unknown pack entry type: {entry_kind}")
+
+        for delta_pack, delta_offset, delta in reversed(chain):
+            data = apply_delta(data, delta)
+            with self.lock:
+                self.bases[(delta_pack.key, delta_offset)] = (kind, data)
+                while len(self.bases) > NATIVE_BASE_CACHE_SIZE:
+                    self.bases.popitem(last=False)
+        return kind, data
+
+    def locate(self, oid: bytes) -> Optional[tuple[PackFile, int]]:
+        for pack in self.packs:
+            offset = pack.find(oid)
+            if offset is not None:
+                return pack, offset
+        return None
+
+    def read_object(self, oid: bytes) -> Optional[tuple[str, bytes]]:
+        """Return (type, contents) of an object, or None if it doesn't exist."""
+        located = self.locate(oid)
+        if located is not None:
+            return self.read_packed(*located)
+        return self.read_loose(oid)
+
+    def read_commit(self, oid: bytes) -> Dict[str, Any]:
+        """Parsed commit, from a small LRU since commits never change."""
+        with self.lock:
+            commit = self.commits.get(oid)
+            if commit is not None:
+                self.commits.move_to_end(oid)
+                return commit
+        obj = self.read_object(oid)
+        if obj is None or obj[0] != 'commit':
+            raise KeyError(oid.hex())
+        commit = parse_commit(oid.hex(), obj[1])
+        with self.lock:
+            self.commits[oid] = commit
+            while len(self.commits) > NATIVE_COMMIT_CACHE_SIZE:
+                self.commits.popitem(last=False)
+        return commit
+
+    def parents_and_time(self, oid: bytes) -> tuple[list[bytes], int]:
+        """Parents and commit time, from the commit-graph when it covers the commit."""
+        graph = self.commit_graph
+        if graph is not None:
+            pos = graph.find(oid)
+            if pos is not None:
+                return graph.commit(pos)
+        commit = self.read_commit(oid)
+        return [bytes.fromhex(p) for p in commit['parents']], commit['commit_time']
+
+    def peel(self, oid: bytes) -> bytes:
+        """Follow annotated tags to the commit they point at."""
+        for _ in range(16):
+            obj = self.read_object(oid)
+            if obj is None:
+                raise KeyError(oid.hex())
+            if obj[0] == 'commit':
+                return oid
+            if obj[0] != 'tag' or not obj[1].startswith(b'object '):
+                raise KeyError(f"Not a commit: {oid.hex()}")
+            oid = bytes.fromhex(obj[1][7:47].decode('ascii'))
+        raise KeyError(f"Tag chain too long: {oid.hex()}")
+
+    def abbreviation_length(self) -> int:
+        """git's default abbreviation length, from the number of packed objects."""
+        count = sum(pack.count for pack in self.packs)
+        return max(7, (count.bit_length() + 1) // 2)
+
+    def abbreviate(self, oid: bytes, length: int) -> str:
+        """Shortest prefix of at least `length` hex digits that is unique, like %h."""
+        name = oid.hex()
+        needed = length
+        neighbours = []
+        for pack in self.packs:
+            pos = pack.bisect(oid)
+            for other in (pos - 1, pos, pos + 1):
+                if 0 <= other < pack.count:
+                    neighbours.append(pack.name(other).hex())
+        try:
+            neighbours.extend(name[:2] + entry for entry in os.listdir(os.path.join(self.objects_dir, name[:2])))
+        except OSError:
+            pass
+        for other in neighbours:
+            if other != name:
+                common = len(os.path.commonprefix([name, other]))
+                needed = max(needed, common + 1)
+        return name[:needed]
+
+    def refs(self) -> Dict[str, bytes]:
+        """All refs under refs/ as {refname: object name}, symbolic refs resolved."""
+        state = self.repo.ref_state()
+        if self.refs_cache is not None and self.refs_cache[0] == state:
+            return self.refs_cache[1]
+
+        refs: Dict[str, bytes] = {}
+        try:
+            with open(os.path.join(self.repo.common_dir, 'packed-refs'), 'r', encoding='utf-8') as f:
+                for line in f:
+                    if line.startswith(('#', '^')):
+                        continue
+                    oid, _, refname = line.rstrip('\n').partition(' ')
+                    refs[refname] = bytes.fromhex(oid)
+        except FileNotFoundError:
+            pass
+
+        symbolic = {}
+        refs_dir = os.path.join(self.repo.common_dir, 'refs')
+        for directory, _, files in os.walk(refs_dir):
+            for name in files:
+                if name.endswith('.lock'):
+                    continue
+                path = os.path.join(directory, name)
+                refname = 'refs/' + os.path.relpath(path, refs_dir).replace(os.sep, '/')
+                try:
+                    with open(path, 'r', encoding='utf-8') as f:
+                        value = f.read().strip()
+                except OSError:
+                    continue
+                if value.startswith('ref: '):
+                    symbolic[refname] = value[5:]
+                elif len(value) == 40:
+                    refs[refname] = bytes.fromhex(value)
+        for refname, target in symbolic.items():
+            # Dangling symbolic refs are skipped, as for-each-ref does
+            if target in refs:
+                refs[refname] = refs[target]
+
+        self.refs_cache = (state, refs)
+        return refs
+
+    def head(self) -> Optional[bytes]:
+        try:
+            with open(os.path.join(self.repo.git_dir, 'HEAD'), 'r', encoding='utf-8') as f:
+                value = f.read().strip()
+        except OSError:
+            return None
+        if value.startswith('ref: '):
+            return self.refs().get(value[5:])
+        return bytes.fromhex(value)
+
+    def resolve(self, rev: str) -> bytes:
+        """Resolve a revision to a commit: a ref or hash, optionally with ~N and ^N suffixes.
+
+        Anything fancier (rev^{tree}, @{upstream}, :/text...) raises NativeUnsupported.
+        """
+        match = re.fullmatch(r'([^~^:@{}\s]+?)((?:[~^]\d*)*)', rev)
+        if not match:
+            raise NativeUnsupported(f"Unsupported revision: {rev}")
+        name, suffixes = match.groups()
+        oid = self.lookup_name(name)
+        if oid is None:
+            raise KeyError(rev)
+        oid = self.peel(oid)
+        for op, count in re.findall(r'([~^])(\d*)', suffixes):
+            number = int(count) if count else 1
+            if op == '~':
+                for _ in range(number):
+                    parents = self.parents_and_time(oid)[0]
+                    if not parents:
+                        raise KeyError(rev)
+                    oid = parents[0]
+            elif number:
+                parents = self.parents_and_time(oid)[0]
+                if number > len(parents):
+                    raise KeyError(rev)
+                oid = parents[number - 1]
+        return oid
+
+    def lookup_name(self, name: str) -> Optional[bytes]:
+        """Refs first, in git's lookup order, then full or abbreviated hashes."""
+        if re.fullmatch(r'[0-9a-fA-F]{40}', name):
+            return bytes.fromhex(name)
+        if name == 'HEAD':
+            return self.head()
+        refs = self.refs()
+        for pattern in ('{}', 'refs/{}', 'refs/tags/{}', 'refs/heads/{}', 'refs/remotes/{}', 'refs/remotes/{}/HEAD'):
+            oid = refs.get(pattern.format(name))
+            if oid is not None:
+                return oid
+        if re.fullmatch(r'[0-9a-fA-F]{4,39}', name):
+            return self.lookup_prefix(name.lower())
+        return None
+
+    def lookup_prefix(self, prefix: str) -> Optional[bytes]:
+        matches = set()
+        low = bytes.fromhex((prefix + '0' * 40)[:40])
+        for pack in self.packs:
+            pos = pack.bisect(low)
+            while pos < pack.count and len(matches) < 2:
+                name = pack.name(pos)
+                if not name.hex().startswith(prefix):
+                    break
+                matches.add(name)
+                pos += 1
+        try:
+            for entry in os.listdir(os.path.join(self.objects_dir, prefix[:2])):
+                if (prefix[:2] + entry).startswith(prefix):
+                    matches.add(bytes.fromhex(prefix[:2] + entry))
+        except OSError:
+            pass
+        if len(matches) > 1:
+            raise NativeUnsupported(f"Ambiguous abbreviation: {prefix}")
+        return matches.pop() if matches else None
+
+    def walk(self, starts: list[bytes]) -> Iterator[bytes]:
+        """Commits reachable from `starts`, newest commit time first, like `git log`."""
+        heap = []
+        seen = set()
+        counter = itertools.count()
+        for oid in starts:
+            if oid not in seen:
+                seen.add(oid)
+                parents, commit_time = self.parents_and_time(oid)
+                heapq.heappush(heap, (-commit_time, next(counter), oid, parents))
+        while heap:
+            _, _, oid, parents = heapq.heappop(heap)
+            yield oid
+            for parent in parents:
+                if parent not in seen:
+                    seen.add(parent)
+                    grandparents, commit_time = self.parents_and_time(parent)
+                    heapq.heappush(heap, (-commit_time, next(counter), parent, grandparents))
+
+    def log_page(self, rev: str, limit: int, after: str = "") -> tuple[list[Dict[str, str]], str]:
+        """Same records and cursor as read_log_page for `git log <rev>`."""
+        self.refresh()
+        start = self.resolve(rev)
+        length = self.abbreviation_length()
+        records = []
+        next_cursor = ""
+        after_hash = after.partition(':')[0]
+        skipping = bool(after_hash)
+        for position, oid in enumerate(self.walk([start])):
+            if skipping:
+                skipping = not oid.hex().startswith(after_hash)
+                continue
+            if len(records) == limit:
+                next_cursor = f"{records[-1]['hash']}:{position}"
+                break
+            commit = self.read_commit(oid)
+            records.append({
+                'hash': commit['hash'],
+                'short_hash': self.abbreviate(oid, length),
+                'date': commit_date(commit),
+                'author': commit['author'],
+                'subject': split_message(commit['message'])[0],
+            })
+        if skipping:
+            raise KeyError(f"Cursor not found in history: {after}")
+        return records, next_cursor
+
+    def tree_entries(self, oid: Optional[bytes]) -> Dict[str, tuple[int, bytes]]:
+        if oid is None:
+            return {}
+        obj = self.read_object(oid)
+        if obj is None or obj[0] != 'tree':
+            raise KeyError(oid.hex())
+        data = obj[1]
+        entries = {}
+        pos = 0
+        while pos < len(data):
+            space = data.index(b' ', pos)
+            nul = data.index(b'\0', space)
+            mode = int(data[pos:space], 8)
+            entries[data[space + 1:nul].decode('utf-8', errors='replace')] = (mode, data[nul + 1:nul + 21])
+            pos = nul + 21
+        return entries
+
+    def diff_trees(self, old: Optional[bytes], new: Optional[bytes], prefix: str = "") -> list[tuple[str, str, Optional[tuple[int, bytes]], Optional[tuple[int, bytes]]]]:
+        """(status, path, old entry, new entry) for every changed file, skipping unchanged subtrees."""
+        old_entries = self.tree_entries(old)
+        new_entries = self.tree_entries(new)
+        changes = []
+        for name in old_entries.keys() | new_entries.keys():
+            before = old_entries.get(name)
+            after = new_entries.get(name)
+            if before == after:
+                continue
+            path = prefix + name
+            before_tree = before is not None and stat.S_ISDIR(before[0])
+            after_tree = after is not None and stat.S_ISDIR(after[0])
+            if before_tree or after_tree:
+                changes.extend(self.diff_trees(
+                    before[1] if before_tree else None, after[1] if after_tree else None, path + '/'
+                ))
+                if before is not None and not before_tree:
+                    changes.append(('D', path, before, None))
+                if after is not None and not after_tree:
+                    changes.append(('A', path, None, after))
+            elif before is None:
+                changes.append(('A', path, None, after))
+            elif after is None:
+                changes.append(('D', path, before, None))
+            elif stat.S_IFMT(before[0]) != stat.S_IFMT(after[0]):
+                changes.append(('T', path, before, after))
+            else:
+                changes.append(('M', path, before, after))
+        return changes
+
+    def name_status(self, oid: bytes) -> str:
+        """Like `git show --name-status` for a non-merge commit, with exact renames only."""
+        commit = self.read_commit(oid)
+        if len(commit['parents']) > 1:
+            raise NativeUnsupported("Merge commits need git's combined diff")
+        parent_tree = None
+        if commit['parents']:
+            parent_tree = bytes.fromhex(self.read_commit(bytes.fromhex(commit['parents'][0]))['tree'])
+        changes = self.diff_trees(parent_tree, bytes.fromhex(commit['tree']))
+
+        # Pair deletions and additions of the same blob as exact renames
+        deleted: Dict[tuple[int, bytes], list[str]] = {}
+        for status, path, before, _ in changes:
+            if status == 'D':
+                deleted.setdefault(before, []).append(path)
+        renames = {}
+        for status, path, _, after in changes:
+            if status == 'A' and deleted.get(after):
+                renames[path] = deleted[after].pop(0)
+        sources = set(renames.values())
+
+        lines = []
+        for status, path, _, _ in changes:
+            if status == 'A' and path in renames:
+                lines.append((path, f"R100\t{renames[path]}\t{path}"))
+            elif not (status == 'D' and path in sources):
+                lines.append((path, f"{status}\t{path}"))
+        return "\n".join(line for _, line in sorted(lines))
+
+    def commit_details(self, rev: str) -> tuple[str, str]:
+        """(header like get_commit_info's --pretty format, name-status) for a revision."""
+        self.refresh()
+        oid = self.resolve(rev)
+        commit = self.read_commit(oid)
+        subject, body = split_message(commit['message'])
+        header = f"{commit['hash']}\n{commit_date(commit)}\n{commit['author']} <{commit['email']}>\n{subject}\n\n{body}"
+        return header, self.name_status(oid)
+
+# In-process repository readers by repository root
+_native_repos: Dict[str, NativeRepository] = {}
+
+def get_native_repo(repo_path: str) -> NativeRepository:
+    try:
+        repo = get_repository(repo_path)
+    except RuntimeError as e:
+        raise NativeUnsupported(str(e))
+    native = _native_repos.get(repo.root)
+    if native is None or native.repo is not repo:
+        native = _native_repos[repo.root] = NativeRepository(repo)
+    return native
+
+def run_native(repo_path: str, query: str, *args: Any) -> Any:
+    """Call a NativeRepository method (from a worker thread).
+
+    Any failure to read the repository, including corrupt or truncated data
+    the parsers trip over, raises NativeUnsupported so callers can ask git.
+    """
+    try:
+        return getattr(get_native_repo(repo_path), query)(*args)
+    except NativeUnsupported:
+        raise
+    except Exception as e:
+        raise NativeUnsupported(f"{type(e).__name__}: {e}") from e
+
+def parse_log_record(line: str) -> Dict[str, str]:
+    """Parse a line of `git log --pretty=format:LOG_FORMAT` output."""
+    full_hash, short_hash, date, author, subject = line.split('\x1f', 4)
+    return {'hash': full_hash, 'short_hash': short_hash, 'date': date, 'author': author, 'subject': subject}
+
+def format_log_record(record: Dict[str, str]) -> str:
+    """Format a parsed log record like format_commit_info."""
+    return f"[{record['short_hash']}] {record['date']} - {record['author']}\n  {record['subject']}"
+
+async def read_log_page(repo_path: str, args: list[str], limit: int, after: str = "") -> tuple[list[Dict[str, str]], str]:
+    """Read one page of `git log <args>` records as they stream in.
+    
+    Cursors are "<hash>:<position>": the last record of the previous page
+    and how many records came up to and including it. git skips straight to
+    that record, and the hash confirms history hasn't changed since; if it
+    has, or the cursor is a bare hash, history is scanned from the top for
+    the first record whose hash starts with the cursor's. Returns (records,
+    next cursor), and the cursor is "" on the last page.
+    """
+    after_hash, _, position = after.partition(':')
+    if position.isdigit() and int(position) > 0:
+        page = await scan_log_page(repo_path, args, limit, after_hash, int(position) - 1)
+        if page is not None:
+            return page
+    page = await scan_log_page(repo_path, args, limit, after_hash, 0)
+    if page is None:
+        raise RuntimeError(f"Cursor not found in history: {after}")
+    return page
+
+async def scan_log_page(repo_path: str, args: list[str], limit: int, after_hash: str, skip: int) -> Optional[tuple[list[Dict[str, str]], str]]:
+    """One read_log_page attempt, starting `skip` records in.
+    
+    Records up to and including the one whose hash starts with `after_hash`
+    are skipped; after a skip it has to be the first record. git is stopped
+    as soon as the page is full and one more record shows that there is a
+    next page. Returns None if the cursor's record wasn't found.
+    """
+    if skip:
+        bounds = [f'--skip={skip}', f'--max-count={limit + 2}']
+    elif after_hash:
+        bounds = []
+    else:
+        bounds = [f'--max-count={limit + 1}']
+    records = []
+    next_cursor = ""
+    skipping = bool(after_hash)
+    position = skip
+    async with aclosing(stream_git_lines(
+        repo_path, ['log', f'--pretty=format:{LOG_FORMAT}', *bounds, *args]
+    )) as lines:
+        async for line in lines:
+            if not line:
+                continue
+            record = parse_log_record(line)
+            position += 1
+            if skipping:
+                skipping = not record['hash'].startswith(after_hash)
+                if skipping and skip:
+                    break
+                continue
+            if len(records) == limit:
+                next_cursor = f"{records[-1]['hash']}:{position - 1}"
+                break
+            records.append(record)
+    
+    if skipping:
+        return None
+    return records, next_cursor
+
+# File history results: (repo, filename, limit, cursor, format, HEAD) -> rendered output
+_history_cache: "OrderedDict[tuple[str, str, int, str, str, str], str]" = OrderedDict()
+
 @mcp.tool()
-async def search_file_history(repo_path: str, filename: str, limit: int = 10) -> str:
+async def search_file_history(
+    repo_path: str,
+    filename: str,
+    limit: int = 10,
+    after: str = "",
+    output_format: str = "text"
+) -> str:
     """Search when a specific file was first introduced and its history.
     
     Args:
         repo_path: Path to the git repository
         filename: Name or path of the file to search for
         limit: Maximum number of commits to show (default: 10)
+        after: Cursor returned by a previous call to fetch the next page (default: first page)
+        output_format: "text" for a readable list or "json" for structured output (default: text)
     """
-    # Search for commits that modified the file
-    stdout, stderr = await run_git_command(
-        repo_path, 
-        ['log', '--oneline', '--follow', f'--max-count={limit}', '--', filename]
-    )
+    if output_format not in ('text', 'json'):
+        return f"Error: Unknown output format: {output_format}"
+    limit = max(limit, 1)
     
-    if stderr:
-        return f"Error: {stderr}"
+    try:
+        head = await get_cat_file(repo_path).object_info('HEAD')
+    except Exception:
+        head = None
+    cache_key = (os.path.abspath(repo_path), filename, limit, after, output_format, head[0] if head else '')
+    if head and cache_key in _history_cache:
+        _history_cache.move_to_end(cache_key)
+        return _history_cache[cache_key]
     
-    if not stdout.strip():
+    # One pass gives both the page of history and the most recent commit
+    # that added the file (renames show as R, so --follow stops at its add)
+    history = []
+    introduced = None
+    current = None
+    next_cursor = ""
+    skipping = bool(after)
+    try:
+        async with aclosing(stream_git_lines(
+            repo_path,
+            ['log', '--follow', '--name-status', f'--pretty=format:%x00{LOG_FORMAT}', '--', filename]
+        )) as lines:
+            async for line in lines:
+                if line.startswith('\0'):
+                    current = parse_log_record(line[1:])
+                    if skipping:
+                        skipping = not current['hash'].startswith(after)
+                    elif len(history) < limit:
+                        history.append(current)
+                    elif not next_cursor:
+                        next_cursor = history[-1]['hash']
+                    if next_cursor and introduced is not None:
+                        break
+                elif line.startswith('A\t') and introduced is None and current is not None:
+                    introduced = current
+                    if next_cursor:
+                        break
+    except RuntimeError as e:
+        return f"Error: {e}"
+    
+    if skipping:
+        return f"Error: Cursor not found in history: {after}"
+    
+    if output_format == 'json':
+        result = json.dumps({
+            'file': filename,
+            'commits': history,
+            'introduced': introduced,
+            'next_cursor': next_cursor
+        }, ensure_ascii=False)
+    elif not history:
         return f"No commits found for file: {filename}"
+    else:
+        parts = [f"History of file '{filename}':\n\n", "\n\n".join(format_log_record(r) for r in history)]
+        if introduced:
+            parts.append(f"\n\n🎯 File first introduced in:\n{format_log_record(introduced)}")
+        if next_cursor:
+            parts.append(f"\n\nMore commits available, next cursor: {next_cursor}")
+        result = "".join(parts)
     
-    # Get detailed information about the file's history
-    detailed_stdout, _ = await run_git_command(
-        repo_path,
-        ['log', '--follow', f'--max-count={limit}', 
-         '--pretty=format:%h|%ai|%an|%s', '--', filename]
-    )
+    if head:
+        _history_cache[cache_key] = result
+        while len(_history_cache) > HISTORY_CACHE_SIZE:
+            _history_cache.popitem(last=False)
+    return result
+
+@mcp.tool()
+async def search_commits_by_message(
+    repo_path: str,
+    search_term: str,
+    limit: int = 10,
+    after: str = "",
+    output_format: str = "text"
+) -> str:
+    """Search commits by commit message content.
     
-    lines = detailed_stdout.strip().split('\n')
-    formatted_commits = [format_commit_info(line) for line in lines if line.strip()]
+    Args:
+        repo_path: Path to the git repository
+        search_term: Text to search for in commit messages
+        limit: Maximum number of commits to show (default: 10)
+        after: Cursor returned by a previous call to fetch the next page (default: first page)
+        output_format: "text" for a readable list or "json" for structured output (default: text)
+    """
+    if output_format not in ('text', 'json'):
+        return f"Error: Unknown output format: {output_format}"
     
-    result = f"History of file '{filename}':\n\n"
-    result += "\n\n".join(formatted_commits)
+    try:
+        commits, next_cursor = await read_log_page(
+            repo_path, [f'--grep={search_term}', '--all'], max(limit, 1), after
+        )
+    except RuntimeError as e:
+        return f"Error: {e}"
     
-    # Try to find when the file was first added
-    first_commit_stdout, _ = await run_git_command(
-        repo_path,
-        ['log', '--follow', '--diff-filter=A', '--pretty=format:%h|%ai|%an|%s', '--', filename]
-    )
+    if output_format == 'json':
+        return json.dumps({
+            'search_term': search_term,
+            'commits': commits,
+            'next_cursor': next_cursor
+        }, ensure_ascii=False)
     
-    if first_commit_stdout.strip():
-        first_line = first_commit_stdout.strip().split('\n')[0]
-        first_commit = format_commit_info(first_line)
-        result += f"\n\n🎯 File first introduced in:\n{first_commit}"
+    if not commits:
+        return f"No commits found containing: {search_term}"
     
+    result = f"Commits containing '{search_term}':\n\n" + "\n\n".join(format_log_record(c) for c in commits)
+    if next_cursor:
+        result += f"\n\nMore commits available, next cursor: {next_cursor}"
     return result
 
 @mcp.tool()
-async def search_commits_by_message(repo_path: str, search_term: str, limit: int = 10) -> str:
-    """Search commits by commit message content.
+async def get_commit_log(
+    repo_path: str,
+    rev: str = "HEAD",
+    limit: int = 10,
+    after: str = "",
+    output_format: str = "text",
+    backend: str = "git"
+) -> str:
+    """Show the commit log reachable from a revision, newest first.
     
     Args:
         repo_path: Path to the git repository
-        search_term: Text to search for in commit messages
+        rev: Branch, tag, hash or revision like HEAD~5 to start from (default: HEAD)
         limit: Maximum number of commits to show (default: 10)
+        after: Cursor returned by a previous call to fetch the next page (default: first page)
+        output_format: "text" for a readable list or "json" for structured output (default: text)
+        backend: "git", or "native" to walk objects in-process, falling back to git (default: git)
     """
-    stdout, stderr = await run_git_command(
-        repo_path,
-        ['log', f'--grep={search_term}', f'--max-count={limit}', 
-         '--pretty=format:%h|%ai|%an|%s', '--all']
-    )
+    if output_format not in ('text', 'json'):
+        return f"Error: Unknown output format: {output_format}"
     
-    if stderr:
-        return f"Error: {stderr}"
+    if backend not in GIT_BACKENDS:
+        return f"Error: Unknown backend: {backend} (use one of: {', '.join(GIT_BACKENDS)})"
     
-    if not stdout.strip():
-        return f"No commits found containing: {search_term}"
+    limit = max(limit, 1)
+    commits = None
+    if backend == 'native':
+        try:
+            commits, next_cursor = await asyncio.to_thread(run_native, repo_path, 'log_page', rev, limit, after)
+        except NativeUnsupported:
+            commits = None  # Let git answer (and report errors)
+    
+    if commits is None:
+        try:
+            commits, next_cursor = await read_log_page(repo_path, [rev, '--'], limit, after)
+        except RuntimeError as e:
+            return f"Error: {e}"
     
-    lines = stdout.strip().split('\n')
-    formatted_commits = [format_commit_info(line) for line in lines if line.strip()]
+    if output_format == 'json':
+        return json.dumps({
+            'rev': rev,
+            'commits': commits,
+            'next_cursor': next_cursor
+        }, ensure_ascii=False)
     
-    result = f"Commits containing '{search_term}':\n\n"
-    result += "\n\n".join(formatted_commits)
+    if not commits:
+        return f"No commits found for: {rev}"
     
+    result = f"Commit log of '{rev}':\n\n" + "\n\n".join(format_log_record(c) for c in commits)
+    if next_cursor:
+        result += f"\n\nMore commits available, next cursor: {next_cursor}"
     return result
 
+async def list_branch_refs(repo_path: str) -> tuple[list[tuple[str, str]], str]:
+    """Return ([(branch name, tip hash)], stderr) for local and remote branches.
+
+    Names follow `git branch -a`: local branches bare, remote ones as
+    remotes/<remote>/<branch>. Refs are read in-process when possible.
+    """
+    try:
+        refs = await asyncio.to_thread(run_native, repo_path, 'refs')
+        ref_list = [(refname, oid.hex()) for refname, oid in sorted(refs.items())]
+        stderr = ""
+    except NativeUnsupported:
+        stdout, stderr = await run_git_command(
+            repo_path,
+            ['for-each-ref', '--format=%(objectname) %(refname)', 'refs/heads', 'refs/remotes']
+        )
+        ref_list = [(refname, oid) for oid, _, refname in (line.partition(' ') for line in stdout.splitlines())]
+    
+    branches = []
+    for refname, oid in ref_list:
+        if refname.startswith('refs/heads/'):
+            branches.append((refname[len('refs/heads/'):], oid))
+        elif refname.startswith('refs/remotes/'):
+            branches.append((refname[len('refs/'):], oid))
+    return branches, stderr
+
+class CommitGraph:
+    """Compact in-memory commit graph of one repository.
+
+    Commits get integer IDs in `rev-list --topo-order` order, so every
+    commit's ID is smaller than its parents' IDs. Object names are packed
+    into one bytes object, commit i's at oids[i * width:(i + 1) * width],
+    and `by_oid` lists the IDs in object name order for binary search.
+    Parents are stored flat in `parent_ids`, with commit i's parents at
+    parent_start[i]:parent_start[i + 1]. Generation numbers (1 for roots,
+    1 + max over parents otherwise) prune ancestry walks.
+    """
+
+    def __init__(self, fingerprint: tuple):
+        self.fingerprint = fingerprint
+        self.width = 20
+        self.oids = b''
+        self.by_oid = array('l')
+        self.parent_start = array('l', [0])
+        self.parent_ids = array('l')
+        self.generation = array('l')
+        self.branches: list[tuple[str, int]] = []
+        self.head: Optional[int] = None
+        self.counts: Dict[int, int] = {}
+
+    @classmethod
+    def from_rev_list(cls, rev_list: str, refs: list[tuple[str, str]], head: str, fingerprint: tuple) -> "CommitGraph":
+        graph = cls(fingerprint)
+        rows = [line.split() for line in rev_list.splitlines() if line]
+        if rows:
+            graph.width = len(rows[0][0]) // 2
+        graph.oids = bytes.fromhex(''.join(row[0] for row in rows))
+        graph.by_oid = array('l', sorted(range(len(rows)), key=graph.oid_bytes))
+        
+        # Only needed while the parents are resolved
+        ids = {row[0]: cid for cid, row in enumerate(rows)}
+        for row in rows:
+            for parent in row[1:]:
+                # Parents outside the graph (shallow clones) are left out
+                pid = ids.get(parent)
+                if pid is not None:
+                    graph.parent_ids.append(pid)
+            graph.parent_start.append(len(graph.parent_ids))
+        
+        generation = [0] * len(rows)
+        for cid in range(len(rows) - 1, -1, -1):
+            parents = graph.parents(cid)
+            generation[cid] = 1 + max((generation[p] for p in parents), default=0)
+        graph.generation = array('l', generation)
+        
+        graph.branches = [(name, cid) for name, cid in ((name, ids.get(oid)) for name, oid in refs)
+                          if cid is not None]
+        graph.head = ids.get(head)
+        return graph
+
+    def __len__(self) -> int:
+        return len(self.by_oid)
+
+    def parents(self, cid: int) -> array:
+        return self.parent_ids[self.parent_start[cid]:self.parent_start[cid + 1]]
+
+    def id_of(self, oid: str) -> Optional[int]:
+        try:
+            name = bytes.fromhex(oid)
+        except ValueError:
+            return None
+        pos = bisect.bisect_left(self.by_oid, name, key=self.oid_bytes)
+        if pos < len(self.by_oid) and self.oid_bytes(self.by_oid[pos]) == name:
+            return self.by_oid[pos]
+        return None
+
+    def oid_bytes(self, cid: int) -> bytes:
+        return self.oids[cid * self.width:(cid + 1) * self.width]
+
+    def oid(self, cid: int) -> str:
+        return self.oid_bytes(cid).hex()
+
+    def branches_containing(self, targets: list[int]) -> Dict[int, list[str]]:
+        """Map commit IDs to the branches containing them.
+
+        Branch bitmasks are pushed from the tips to parents in ID order,
+        which visits every child before its parents; the sweep stops after
+        the last target. This only saves work in memory: the graph itself
+        comes from one complete `rev-list --all`.
+        """
+        if not targets or not self.branches:
+            return {}
+        
+        masks: Dict[int, int] = {}
+        for bit, (_, cid) in enumerate(self.branches):
+            masks[cid] = masks.get(cid, 0) | (1 << bit)
+        
+        wanted = set(targets)
+        found: Dict[int, int] = {}
+        for cid in range(min(masks), max(wanted) + 1):
+            mask = masks.pop(cid, 0)
+            if cid in wanted:
+                found[cid] = mask
+            if mask:
+                for parent in self.parents(cid):
+                    masks[parent] = masks.get(parent, 0) | mask
+        
+        return {
+            cid: [name for bit, (name, _) in enumerate(self.branches) if mask >> bit & 1]
+            for cid, mask in found.items() if mask
+        }
+
+    def is_ancestor(self, ancestor: int, descendant: int) -> bool:
+        """True if `ancestor` is reachable from `descendant` (or equal to it)."""
+        if ancestor == descendant:
+            return True
+        target_generation = self.generation[ancestor]
+        stack = [descendant]
+        seen = {descendant}
+        while stack:
+            for parent in self.parents(stack.pop()):
+                if parent == ancestor:
+                    return True
+                # Only descendants of `ancestor` lead to it: they have lower IDs and higher generations
+                if parent in seen or parent > ancestor or self.generation[parent] <= target_generation:
+                    continue
+                seen.add(parent)
+                stack.append(parent)
+        return False
+
+    def count(self, cid: int) -> int:
+        """Number of commits reachable from `cid`, like `git rev-list --count`."""
+        if cid not in self.counts:
+            seen = bytearray(len(self))
+            seen[cid] = 1
+            stack = [cid]
+            total = 1
+            while stack:
+                for parent in self.parents(stack.pop()):
+                    if not seen[parent]:
+                        seen[parent] = 1
+                        total += 1
+                        stack.append(parent)
+            self.counts[cid] = total
+        return self.counts[cid]
+
+    def oldest(self, cids: list[int]) -> Optional[int]:
+        """The candidate furthest from the tips (lowest generation), e.g. the first introduction."""
+        return min(cids, key=lambda cid: (self.generation[cid], -cid), default=None)
+
+# Cached commit graphs by repository root, rebuilt when the ref state changes
+_commit_graphs: Dict[str, CommitGraph] = {}
+_commit_graph_locks: Dict[str, asyncio.Lock] = {}
+
+async def get_commit_graph(repo_path: str) -> Optional[CommitGraph]:
+    """Return the repository's commit graph, loading it if refs have moved."""
+    try:
+        repo = get_repository(repo_path)
+    except RuntimeError:
+        return None
+    key = repo.root
+    lock = _commit_graph_locks.setdefault(key, asyncio.Lock())
+    async with lock:
+        fingerprint = repo.ref_state()
+        graph = _commit_graphs.get(key)
+        if graph is not None and graph.fingerprint == fingerprint:
+            return graph
+        
+        refs, stderr = await list_branch_refs(repo_path)
+        if stderr:
+            return None
+        rev_list, stderr = await run_git_command(repo_path, ['rev-list', '--all', '--topo-order', '--parents'])
+        if stderr:
+            return None
+        head = await get_cat_file(repo_path).object_info('HEAD^{commit}')
+        
+        graph = CommitGraph.from_rev_list(rev_list, refs, head[0] if head else '', fingerprint)
+        _commit_graphs[key] = graph
+        return graph
+
+async def branches_containing(repo_path: str, commit_hashes: list[str]) -> Dict[str, list[str]]:
+    """Map each commit hash to the branches that contain it, using the cached commit graph.
+
+    No git runs here once the graph is loaded, so there is no history walk
+    to cut short; loading it reads all of `rev-list --all`.
+    """
+    graph = await get_commit_graph(repo_path)
+    if graph is None:
+        return {}
+    ids = {}
+    for commit_hash in commit_hashes:
+        cid = graph.id_of(commit_hash)
+        if cid is not None:
+            ids[cid] = commit_hash
+    return {ids[cid]: branches for cid, branches in graph.branches_containing(list(ids)).items()}
+
+async def resolve_commit_id(repo_path: str, graph: CommitGraph, rev: str) -> Optional[int]:
+    """Resolve any revision expression (hash, branch, HEAD~2, tag) to a graph ID.
+
+    Returns None for anything that doesn't name a commit, including names
+    cat-file can't take (a newline) and a cat-file process that died.
+    """
+    try:
+        info = await get_cat_file(repo_path).object_info(f"{rev}^{{commit}}")
+    except (ValueError, RuntimeError):
+        return None
+    return graph.id_of(info[0]) if info else None
+
 @mcp.tool()
 async def find_branches_with_feature(repo_path: str, search_term: str) -> str:
     """Find branches that contain commits with specific features or keywords.
@@ -125,10 +1747,10 @@ async def find_branches_with_feature(repo_path: str, search_term: str) -> str:
         repo_path: Path to the git repository
         search_term: Feature or keyword to search for
     """
-    # First find commits with the search term
+    # Find commits with the search term, reading their metadata in the same pass
     stdout, stderr = await run_git_command(
         repo_path,
-        ['log', f'--grep={search_term}', '--pretty=format:%H', '--all']
+        ['log', f'--grep={search_term}', '--pretty=format:%H %h|%ai|%an|%s', '--all']
     )
     
     if stderr:
@@ -137,50 +1759,91 @@ async def find_branches_with_feature(repo_path: str, search_term: str) -> str:
     if not stdout.strip():
         return f"No commits found containing: {search_term}"
     
-    commit_hashes = stdout.strip().split('\n')
-    branch_info = {}
+    commits = [line.split(' ', 1) for line in stdout.strip().split('\n') if line.strip()]
+    containing = await branches_containing(repo_path, [commit_hash for commit_hash, _ in commits])
     
-    # For each commit, find which branches contain it
-    for commit_hash in commit_hashes[:5]:  # Limit to first 5 commits
-        branch_stdout, _ = await run_git_command(
-            repo_path,
-            ['branch', '-a', '--contains', commit_hash]
-        )
-        
-        if branch_stdout:
-            branches = [b.strip().lstrip('* ') for b in branch_stdout.split('\n') if b.strip()]
-            
-            # Get commit info
-            commit_info_stdout, _ = await run_git_command(
-                repo_path,
-                ['show', '--no-patch', '--pretty=format:%h|%ai|%an|%s', commit_hash]
+    entries = []
+    for commit_hash, info in commits:
+        branches = containing.get(commit_hash)
+        if branches:
+            entries.append(
+                f"📍 {format_commit_info(info)}\n"
+                f"   Found in branches: {', '.join(branches)}\n"
             )
-            
-            if commit_info_stdout:
-                branch_info[commit_hash] = {
-                    'commit_info': format_commit_info(commit_info_stdout),
-                    'branches': branches
-                }
-    
-    if not branch_info:
+    
+    if not entries:
         return f"No branch information found for commits containing: {search_term}"
     
-    result = f"Branches containing commits with '{search_term}':\n\n"
+    return f"Branches containing commits with '{search_term}':\n\n" + "\n".join(entries) + "\n"
+
+@mcp.tool()
+async def find_branches_containing_commit(repo_path: str, commit_hash: str) -> str:
+    """Find all branches that contain a specific commit.
+    
+    Args:
+        repo_path: Path to the git repository
+        commit_hash: Commit hash or revision (e.g. a tag or HEAD~3)
+    """
+    graph = await get_commit_graph(repo_path)
+    if graph is None:
+        return f"Error: Unable to load commit graph for: {repo_path}"
+    
+    cid = await resolve_commit_id(repo_path, graph, commit_hash)
+    if cid is None:
+        return f"Commit not found: {commit_hash}"
     
-    for commit_hash, info in branch_info.items():
-        result += f"📍 {info['commit_info']}\n"
-        result += f"   Found in branches: {', '.join(info['branches'])}\n\n"
+    branches = graph.branches_containing([cid]).get(cid, [])
+    if not branches:
+        return f"No branches contain commit: {commit_hash}"
     
-    return result
+    return f"Branches containing {graph.oid(cid)[:7]} ({len(branches)}):\n" + "\n".join(f"  {b}" for b in branches)
 
 @mcp.tool()
-async def get_commit_info(repo_path: str, commit_hash: str) -> str:
+async def check_commit_ancestry(repo_path: str, ancestor: str, descendant: str) -> str:
+    """Check whether one commit is an ancestor of another.
+    
+    Args:
+        repo_path: Path to the git repository
+        ancestor: Commit hash or revision that may be the ancestor
+        descendant: Commit hash or revision that may contain it
+    """
+    graph = await get_commit_graph(repo_path)
+    if graph is None:
+        return f"Error: Unable to load commit graph for: {repo_path}"
+    
+    ancestor_id = await resolve_commit_id(repo_path, graph, ancestor)
+    descendant_id = await resolve_commit_id(repo_path, graph, descendant)
+    if ancestor_id is None:
+        return f"Commit not found: {ancestor}"
+    if descendant_id is None:
+        return f"Commit not found: {descendant}"
+    
+    if graph.is_ancestor(ancestor_id, descendant_id):
+        return f"Yes: {ancestor} is an ancestor of {descendant}"
+    return f"No: {ancestor} is not an ancestor of {descendant}"
+
+@mcp.tool()
+async def get_commit_info(repo_path: str, commit_hash: str, backend: str = "git") -> str:
     """Get detailed information about a specific commit.
     
     Args:
         repo_path: Path to the git repository
         commit_hash: Hash of the commit to examine
+        backend: "git" for git show output with a diffstat, or "native" to read objects in-process (no diffstat, exact renames only) (default: git)
     """
+    if backend not in GIT_BACKENDS:
+        return f"Error: Unknown backend: {backend} (use one of: {', '.join(GIT_BACKENDS)})"
+    
+    if backend == 'native':
+        try:
+            header, files = await asyncio.to_thread(run_native, repo_path, 'commit_details', commit_hash)
+            result = f"📋 Commit Details:\n\n{header.rstrip()}"
+            if files:
+                result += f"\n\n📁 Files changed:\n{files}"
+            return result
+        except NativeUnsupported:
+            pass  # Let git answer (and report errors)
+    
     # Get commit details
     stdout, stderr = await run_git_command(
         repo_path,
@@ -206,20 +1869,298 @@ async def get_commit_info(repo_path: str, commit_hash: str) -> str:
     
     return result
 
+def trigrams(text: str) -> set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+def scan_changed_lines(repo_path: str, tips: list[str], exclude: list[str], first_id: int,
+                       stop: threading.Event, timeout: float = TEXT_INDEX_TIMEOUT) -> tuple[list[str], Dict[str, array]]:
+    """Trigram postings for the commits reachable from `tips` but not `exclude`.
+
+    Runs `git log -p` synchronously (call it from a worker thread); commits
+    are numbered from `first_id` in the order git lists them. Every object in
+    `exclude` must exist, or git fails with "bad revision". git runs in its
+    own process group, which is killed after `timeout` or as soon as `stop`
+    is set (e.g. when the awaiting task is cancelled).
+    """
+    # A file rather than a pipe, so a chatty stderr can't block git while
+    # stdout is being read
+    errors = tempfile.TemporaryFile()
+    process = subprocess.Popen(
+        ['git', 'log', '--stdin', '-p', '--text', '--no-renames', '--no-color',
+         '--no-ext-diff', '--unified=0', '--format=%x00%H'],
+        cwd=repo_path,
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=errors,
+        env={**os.environ, 'LC_ALL': 'C.UTF-8'},
+        start_new_session=(os.name == 'posix')
+    )
+    
+    def kill() -> None:
+        try:
+            if os.name == 'posix':
+                os.killpg(process.pid, signal.SIGKILL)
+            else:
+                process.kill()
+        except (ProcessLookupError, PermissionError):
+            pass
+    
+    expired = []
+    
+    def watchdog() -> None:
+        if not stop.wait(timeout):
+            expired.append(True)
+        kill()
+    
+    threading.Thread(target=watchdog, daemon=True).start()
+    try:
+        return read_changed_lines(process, tips, exclude, first_id, errors)
+    finally:
+        stop.set()
+        kill()
+        process.wait()
+        errors.close()
+        if expired:
+            raise RuntimeError(f"git log timed out after {timeout:g}s")
+
+def read_changed_lines(process: subprocess.Popen, tips: list[str], exclude: list[str], first_id: int,
+                       errors) -> tuple[list[str], Dict[str, array]]:
+    """The scan_changed_lines loop over a started `git log --stdin -p`."""
+    revs = tips + [f"^{oid}" for oid in exclude]
+    try:
+        process.stdin.write(("\n".join(revs) + "\n").encode('ascii'))
+        process.stdin.close()
+    except BrokenPipeError:
+        pass
+    
+    commits: list[str] = []
+    postings: Dict[str, array] = {}
+    grams: set[str] = set()
+    
+    def flush() -> None:
+        cid = first_id + len(commits) - 1
+        for gram in grams:
+            posting = postings.get(gram)
+            if posting is None:
+                posting = postings[gram] = array('I')
+            posting.append(cid)
+        grams.clear()
+    
+    in_hunk = False
+    for raw_line in process.stdout:
+        if raw_line.startswith(b'\0'):
+            if commits:
+                flush()
+            commits.append(raw_line[1:].strip().decode('ascii'))
+            in_hunk = False
+        elif raw_line.startswith(b'diff '):
+            in_hunk = False
+        elif raw_line.startswith(b'@@'):
+            in_hunk = True
+        elif in_hunk and raw_line[:1] in (b'+', b'-'):
+            line = raw_line[1:].rstrip(b'\n').decode('utf-8', errors='replace')
+            grams.update(line[i:i + 3] for i in range(len(line) - 2))
+    if commits:
+        flush()
+    
+    if process.wait() != 0:
+        errors.seek(0)
+        message = errors.read().decode('utf-8', errors='replace').strip()
+        raise RuntimeError(message or f"git log exited with status {process.returncode}")
+    return commits, postings
+
+class TextIndex:
+    """Persistent trigram index of the lines each commit adds or removes.
+
+    `git log -S text` lists commits that change how often `text` occurs in
+    some file. For single-line text that means an added or removed line
+    contains it, so all of the text's trigrams appear in the commit's changed
+    lines. Intersecting their postings gives a small superset of the
+    matches, and `git log -S` then only has to check those commits. Updates
+    scan just the commits added since the ref tips of the last build.
+    """
+
+    def __init__(self, repo: GitRepository):
+        self.repo = repo
+        self.repo_path = repo.root
+        self.path = os.path.join(repo.common_dir, TEXT_INDEX_FILE)
+        self.commits: list[str] = []
+        self.postings: Dict[str, array] = {}
+        self.tips: list[str] = []
+        self.fingerprint: tuple = ()
+        self.updating: Optional[asyncio.Task] = None
+        self.last_update = 0.0
+
+    def is_current(self) -> bool:
+        return self.fingerprint == self.repo.ref_state()
+
+    def refresh(self) -> asyncio.Task:
+        """Start an incremental update unless one is already running."""
+        if self.updating is None or self.updating.done():
+            self.updating = asyncio.create_task(self.update())
+        return self.updating
+
+    async def update(self) -> int:
+        """Index commits added since the last update; returns how many were new."""
+        start = time.perf_counter()
+        fingerprint = self.repo.ref_state()
+        stdout, stderr = await run_git_command(
+            self.repo_path,
+            ['for-each-ref', '--format=%(objectname) %(objecttype) %(*objecttype)']
+        )
+        if stderr:
+            raise RuntimeError(stderr.strip())
+        # Refs to trees and blobs (e.g. tagged keys) have no history to index
+        tips = {parts[0] for parts in map(str.split, stdout.splitlines())
+                if 'commit' in parts[1:]}
+        head = await get_cat_file(self.repo_path).object_info('HEAD^{commit}')
+        if head:
+            tips.add(head[0])
+        
+        added = 0
+        if tips != set(self.tips):
+            # Old tips that gc has pruned (e.g. a deleted, unmerged branch)
+            # can't be excluded, and without them we no longer know which
+            # commits are already indexed, so start over
+            cat_file = get_cat_file(self.repo_path)
+            found = await asyncio.gather(*(cat_file.object_info(oid) for oid in self.tips))
+            rebuild = not all(found)
+            exclude = [] if rebuild else self.tips
+            # The scan takes a pool slot like any other git; cancelling the
+            # update kills git even though the thread can't be interrupted
+            stop = threading.Event()
+            try:
+                async with _git_pool.slot(self.repo.root):
+                    commits, postings = await asyncio.to_thread(
+                        scan_changed_lines, self.repo_path, sorted(tips), exclude,
+                        0 if rebuild else len(self.commits), stop
+                    )
+            except asyncio.CancelledError:
+                stop.set()
+                raise
+            if rebuild:
+                self.commits, self.postings = [], {}
+            for gram, posting in postings.items():
+                if gram in self.postings:
+                    self.postings[gram].extend(posting)
+                else:
+                    self.postings[gram] = posting
+            self.commits.extend(commits)
+            self.tips = sorted(tips)
+            added = len(commits)
+            await asyncio.to_thread(self.save)
+        self.fingerprint = fingerprint
+        self.last_update = time.perf_counter() - start
+        return added
+
+    def candidates(self, text: str) -> list[str]:
+        """Commits whose changed lines contain every trigram of `text`."""
+        postings = sorted((self.postings.get(gram, ()) for gram in trigrams(text)), key=len)
+        found = set(postings[0])
+        for posting in postings[1:]:
+            if not found:
+                break
+            found.intersection_update(posting)
+        return [self.commits[cid] for cid in found]
+
+    def save(self) -> None:
+        snapshot = {
+            'commits': self.commits,
+            'tips': self.tips,
+            'postings': {gram: base64.b64encode(posting.tobytes()).decode('ascii')
+                         for gram, posting in self.postings.items()},
+        }
+        temp_path = self.path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(snapshot, f, ensure_ascii=False)
+        os.replace(temp_path, self.path)
+
+    def load(self) -> bool:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                snapshot = json.load(f)
+            postings = {}
+            for gram, encoded in snapshot['postings'].items():
+                posting = postings[gram] = array('I')
+                posting.frombytes(base64.b64decode(encoded))
+            self.commits, self.tips, self.postings = snapshot['commits'], snapshot['tips'], postings
+            return True
+        except (OSError, ValueError, KeyError, TypeError):
+            return False
+
+# Text indexes by repository root; created by build_text_index or loaded from the git dir
+_text_indexes: Dict[str, TextIndex] = {}
+
+async def get_text_index(repo_path: str, create: bool = False) -> Optional[TextIndex]:
+    """Return the repository's text index, loading a saved one from disk.
+
+    Returns None if there is none yet, unless `create` is set.
+    """
+    try:
+        repo = get_repository(repo_path)
+    except RuntimeError:
+        return None
+    index = _text_indexes.get(repo.root)
+    if index is None:
+        index = TextIndex(repo)
+        loaded = os.path.exists(index.path) and await asyncio.to_thread(index.load)
+        if not loaded and not create:
+            return None
+        _text_indexes[repo.root] = index
+    return index
+
+async def indexed_pickaxe_candidates(repo_path: str, text: str) -> Optional[list[str]]:
+    """Candidate commits for `git log -S text` from the text index.
+
+    Returns None when the live pickaxe has to be used instead: no index,
+    text the trigram index can't narrow, or an index that can't be brought
+    up to date within TEXT_INDEX_WAIT (the update keeps going in the
+    background for the next search).
+    """
+    if len(text) < 3 or '\n' in text:
+        return None
+    index = await get_text_index(repo_path)
+    if index is None:
+        return None
+    
+    if not index.is_current():
+        try:
+            await asyncio.wait_for(asyncio.shield(index.refresh()), TEXT_INDEX_WAIT)
+        except Exception:
+            return None
+    
+    # Commits no longer reachable from any ref (rewritten history) stay in the index
+    graph = await get_commit_graph(repo_path)
+    if graph is None:
+        return None
+    return [oid for oid in index.candidates(text) if graph.id_of(oid) is not None]
+
 @mcp.tool()
-async def find_commit_introducing_text(repo_path: str, text: str, file_path: str = "") -> str:
+async def find_commit_introducing_text(repo_path: str, text: str, file_path: str = "", use_index: bool = True) -> str:
     """Find the commit that introduced specific text or code.
     
     Args:
         repo_path: Path to the git repository
         text: Text or code to search for
         file_path: Optional specific file to search in (empty for all files)
+        use_index: Narrow the search with the repository's text index if one was built (default: True)
     """
-    command = ['log', '-S', text, '--oneline', '--all']
+    candidates = await indexed_pickaxe_candidates(repo_path, text) if use_index else None
+    
+    if candidates is None:
+        command = ['log', '-S', text, '--oneline', '--all']
+        stdin = None
+    else:
+        # Only the candidates need the real pickaxe check; --no-walk keeps git from walking their history
+        command = ['log', '-S', text, '--oneline', '--no-walk', '--stdin']
+        stdin = "\n".join(candidates) + "\n"
     if file_path:
         command.extend(['--', file_path])
     
-    stdout, stderr = await run_git_command(repo_path, command)
+    if candidates == []:
+        stdout, stderr = "", ""
+    else:
+        stdout, stderr = await run_git_command(repo_path, command, stdin)
     
     if stderr:
         return f"Error: {stderr}"
@@ -233,45 +2174,124 @@ async def find_commit_introducing_text(repo_path: str, text: str, file_path: str
     
     result = f"Commits that introduced text '{text}':\n\n"
     
-    for commit_hash in commit_hashes[:5]:  # Limit to first 5 commits
-        detail_stdout, _ = await run_git_command(
-            repo_path,
-            ['show', '--no-patch', '--pretty=format:%h|%ai|%an|%s', commit_hash]
-        )
-        
-        if detail_stdout:
-            result += format_commit_info(detail_stdout) + "\n\n"
+    cat_file = get_cat_file(repo_path)
+    commits = await asyncio.gather(*(cat_file.read_commit(h) for h in commit_hashes[:5]))  # Limit to first 5 commits
+    
+    for short_hash, commit in zip(commit_hashes, commits):
+        if commit:
+            result += format_commit_info(commit_line(commit, short_hash)) + "\n\n"
     
     return result
 
 @mcp.tool()
-async def get_repository_summary(repo_path: str) -> str:
-    """Get a summary of the repository including branches, recent commits, and basic stats.
+async def build_text_index(repo_path: str) -> str:
+    """Build or update the text index used by find_commit_introducing_text.
+    
+    The index maps trigrams of every added or removed line to the commits
+    that changed them and is saved in the repository's git directory. Once
+    built, it is updated incrementally as new commits arrive.
     
     Args:
         repo_path: Path to the git repository
     """
-    # Get current branch
-    current_branch_stdout, _ = await run_git_command(repo_path, ['branch', '--show-current'])
-    current_branch = current_branch_stdout.strip()
+    try:
+        get_repository(repo_path)
+    except RuntimeError as e:
+        return f"Error: {e}"
     
-    # Get all branches
-    branches_stdout, _ = await run_git_command(repo_path, ['branch', '-a'])
+    index = await get_text_index(repo_path, create=True)
+    
+    try:
+        added = await index.refresh()
+    except Exception as e:
+        return f"Error building text index: {str(e)}"
     
-    # Get recent commits
-    recent_commits_stdout, _ = await run_git_command(
-        repo_path, 
-        ['log', '--oneline', '--max-count=5', '--pretty=format:%h|%ai|%an|%s']
+    return (
+        f"Text index for {index.repo_path}: {len(index.commits):,} commits ({added:,} new), "
+        f"{len(index.postings):,} trigrams, updated in {index.last_update:.2f}s\n"
+        f"Saved to: {index.path}"
     )
+
+# Rendered summaries: (repo, count mode) -> (ref state, created at, text, timings)
+_summary_cache: "OrderedDict[tuple[str, str], tuple[tuple, float, str, Dict[str, float]]]" = OrderedDict()
+
+async def timed(name: str, timings: Dict[str, float], awaitable) -> Any:
+    """Await a sub-query and record how long it took."""
+    start = time.perf_counter()
+    try:
+        return await awaitable
+    finally:
+        timings[name] = time.perf_counter() - start
+
+async def count_commits(repo_path: str, count_mode: str) -> str:
+    """Commit count on HEAD: exact rev-list, cached commit graph, or capped estimate."""
+    if count_mode == 'cached':
+        graph = await get_commit_graph(repo_path)
+        if graph is not None and graph.head is not None:
+            return str(graph.count(graph.head))
     
-    # Get repository stats
-    total_commits_stdout, _ = await run_git_command(repo_path, ['rev-list', '--count', 'HEAD'])
+    if count_mode == 'approximate':
+        stdout, _ = await run_git_command(
+            repo_path, ['rev-list', '--count', f'--max-count={APPROX_COUNT_LIMIT}', 'HEAD']
+        )
+        if stdout.strip() == str(APPROX_COUNT_LIMIT):
+            return f"{APPROX_COUNT_LIMIT:,}+"
+        return stdout
+    
+    stdout, _ = await run_git_command(repo_path, ['rev-list', '--count', 'HEAD'])
+    return stdout
+
+@mcp.tool()
+async def get_repository_summary(
+    repo_path: str,
+    count_mode: str = "exact",
+    cache_ttl: int = SUMMARY_CACHE_TTL,
+    debug: bool = False
+) -> str:
+    """Get a summary of the repository including branches, recent commits, and basic stats.
+    
+    Args:
+        repo_path: Path to the git repository
+        count_mode: How to count commits: "exact" (rev-list), "cached" (commit graph cache) or "approximate" (capped at 10,000) (default: exact)
+        cache_ttl: Seconds to reuse a summary while refs are unchanged, 0 to disable (default: 300)
+        debug: Append per-query timings (default: False)
+    """
+    if count_mode not in COUNT_MODES:
+        return f"Error: Unknown count mode: {count_mode} (use one of: {', '.join(COUNT_MODES)})"
+    
+    try:
+        repo = get_repository(repo_path)
+    except RuntimeError as e:
+        return f"Error: {e}"
+    
+    cache_key = (repo.root, count_mode)
+    state = repo.ref_state()
+    cached = _summary_cache.get(cache_key)
+    if cache_ttl > 0 and cached and cached[0] == state and time.time() - cached[1] < cache_ttl:
+        _summary_cache.move_to_end(cache_key)
+        result, timings = cached[2], cached[3]
+        if debug:
+            result += format_timings(timings, f"cache hit, {time.time() - cached[1]:.0f}s old")
+        return result
     
-    # Get contributors
-    contributors_stdout, _ = await run_git_command(
-        repo_path, 
-        ['shortlog', '-sn', '--all', '--max-count=10']
+    # The sub-queries are independent, so run them all at once
+    timings: Dict[str, float] = {}
+    start = time.perf_counter()
+    (current_branch_stdout, _), (branches_stdout, _), (recent_commits_stdout, _), total_commits_stdout, (contributors_stdout, _) = await asyncio.gather(
+        timed('current branch', timings, run_git_command(repo_path, ['branch', '--show-current'])),
+        timed('branches', timings, run_git_command(repo_path, ['branch', '-a'])),
+        timed('recent commits', timings, run_git_command(
+            repo_path,
+            ['log', '--oneline', '--max-count=5', '--pretty=format:%h|%ai|%an|%s']
+        )),
+        timed(f'commit count ({count_mode})', timings, count_commits(repo_path, count_mode)),
+        timed('contributors', timings, run_git_command(
+            repo_path,
+            ['shortlog', '-sn', '--all', '--max-count=10']
+        )),
     )
+    timings['total'] = time.perf_counter() - start
+    current_branch = current_branch_stdout.strip()
     
     result = f"📊 Repository Summary\n"
     result += f"==================\n\n"
@@ -300,8 +2320,40 @@ async def get_repository_summary(repo_path: str) -> str:
         result += f"👥 Top Contributors:\n"
         result += contributors_stdout + "\n"
     
+    if cache_ttl > 0:
+        _summary_cache[cache_key] = (state, time.time(), result, timings)
+        _summary_cache.move_to_end(cache_key)
+        while len(_summary_cache) > SUMMARY_CACHE_SIZE:
+            _summary_cache.popitem(last=False)
+    
+    if debug:
+        result += format_timings(timings, "computed")
     return result
 
+def format_timings(timings: Dict[str, float], source: str) -> str:
+    lines = [f"\n🔧 Debug ({source}):"]
+    for name, elapsed in timings.items():
+        lines.append(f"  {name}: {elapsed * 1000:.1f} ms")
+    return "\n".join(lines) + "\n"
+
+@mcp.tool()
+async def get_git_stats() -> str:
+    """Get concurrency, timeout and timing counters for git subprocesses.
+    """
+    pool = _git_pool
+    finished = pool.commands - pool.running
+    return "\n".join([
+        "Git Commands:",
+        f"  Started: {pool.commands:,}",
+        f"  Running: {pool.running}",
+        f"  Waiting: {pool.waiting}",
+        f"  Shared with an identical running command: {pool.deduplicated:,}",
+        f"  Timed out: {pool.timeouts:,}",
+        f"  Queue wait: {pool.queue_wait_total / max(pool.commands, 1) * 1000:.1f} ms avg, {pool.queue_wait_max * 1000:.1f} ms max",
+        f"  Run time: {pool.exec_total / max(finished, 1) * 1000:.1f} ms avg, {pool.exec_max * 1000:.1f} ms max",
+        f"Limits: {MAX_CONCURRENT_GIT} concurrent, {MAX_CONCURRENT_GIT_PER_REPO} per repository, {GIT_COMMAND_TIMEOUT}s timeout",
+    ])
+
 if __name__ == "__main__":
     # Initialize and run the server
     mcp.run(transport='stdio')
@@ -0,0 +1,59 @@
+"""Latency benchmark for the git server's native (in-process) backend.
+
+Runs the same metadata queries through git subprocesses and through the
+pure-Python pack reader, on the repository given on the command line
+(ideally a large, packed one):
+
+    python test/bench_git_backend.py /path/to/repo [iterations] [rev]
+
+Merge commits are answered by git in both modes (combined diffs aren't
+implemented natively), so pick a non-merge `rev` for the commit info row.
+"""
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from git_mcp_server import get_commit_info, get_commit_log, get_native_repo, run_git_command
+
+async def git_refs(repo_path: str) -> None:
+    await run_git_command(repo_path, ['for-each-ref', '--format=%(objectname) %(refname)', 'refs/heads', 'refs/remotes'])
+
+async def native_refs(repo_path: str) -> None:
+    # Includes the ref-state check that decides whether the cached refs are current
+    get_native_repo(repo_path).refs()
+
+def queries(repo_path: str, rev: str):
+    return [
+        ("commit info", lambda backend: get_commit_info(repo_path, rev, backend=backend)),
+        ("log, 20 commits", lambda backend: get_commit_log(repo_path, rev, 20, backend=backend)),
+        ("log, 200 commits", lambda backend: get_commit_log(repo_path, rev, 200, backend=backend)),
+        ("ref listing", lambda backend: native_refs(repo_path) if backend == 'native' else git_refs(repo_path)),
+    ]
+
+async def run(query, backend: str, iterations: int) -> float:
+    """Return the mean latency in milliseconds."""
+    await query(backend)  # warm up: packs mapped, cat-file and caches started
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await query(backend)
+    return (time.perf_counter() - start) / iterations * 1000
+
+async def main() -> None:
+    if len(sys.argv) < 2:
+        sys.exit(__doc__)
+    repo_path = sys.argv[1]
+    iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    rev = sys.argv[3] if len(sys.argv) > 3 else 'HEAD'
+    
+    print(f"{'Query':<20} {'git':>12} {'native':>12} {'speedup':>9}")
+    print('-' * 56)
+    for name, query in queries(repo_path, rev):
+        git_ms = await run(query, 'git', iterations)
+        native_ms = await run(query, 'native', iterations)
+        print(f"{name:<20} {git_ms:>9.2f} ms {native_ms:>9.2f} ms {git_ms / native_ms:>8.1f}x")
+
+if __name__ == "__main__":
+    asyncio.run(main())
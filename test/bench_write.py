@@ -0,0 +1,63 @@
+"""Throughput benchmark for the filesystem server's write path.
+
+Compares the original text-mode write (encode once for the size check,
+then write again in text mode) with write_file_bytes in its plain, atomic
+and fsync modes, for many small payloads and a few large ones.
+
+    python test/bench_write.py
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from filesystem import MAX_FILE_SIZE, write_file_bytes
+
+SMALL_PAYLOAD = 'x' * 1024  # 1KB
+SMALL_COUNT = 2000
+LARGE_PAYLOAD = '中文 text ' * (8 * 1024 * 1024 // 14)  # ~8MB encoded
+LARGE_COUNT = 5
+
+def legacy_write(file_path: str, content: str) -> None:
+    if len(content.encode('utf-8')) > MAX_FILE_SIZE:
+        raise ValueError("Content too large")
+    with open(file_path, 'w', encoding='utf-8') as f:
+        f.write(content)
+
+def bytes_write(**options):
+    def write(file_path: str, content: str) -> None:
+        write_file_bytes(file_path, content.encode('utf-8'), **options)
+    return write
+
+MODES = [
+    ("legacy text write", legacy_write),
+    ("bytes write", bytes_write()),
+    ("bytes append", bytes_write(append=True)),
+    ("atomic", bytes_write(atomic=True)),
+    ("atomic + fsync file", bytes_write(atomic=True, fsync='file')),
+    ("atomic + fsync full", bytes_write(atomic=True, fsync='full')),
+]
+
+def run(write, content: str, count: int, directory: str) -> float:
+    """Return MB/s for `count` writes of `content`, cycling through 50 files."""
+    size = len(content.encode('utf-8'))
+    start = time.perf_counter()
+    for i in range(count):
+        write(os.path.join(directory, f"bench_{i % 50}.txt"), content)
+    elapsed = time.perf_counter() - start
+    return size * count / elapsed / (1024 * 1024)
+
+def main() -> None:
+    print(f"{'Mode':<24} {'Small (1KB x 2000)':>20} {'Large (8MB x 5)':>18}")
+    print('-' * 64)
+    for name, write in MODES:
+        with tempfile.TemporaryDirectory() as directory:
+            small = run(write, SMALL_PAYLOAD, SMALL_COUNT, directory)
+        with tempfile.TemporaryDirectory() as directory:
+            large = run(write, LARGE_PAYLOAD, LARGE_COUNT, directory)
+        print(f"{name:<24} {small:>15.1f} MB/s {large:>13.1f} MB/s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Memory soak test for the visualization server's rendering pipeline.
+
+Renders every chart type in turn and prints the RSS of the server process
+and of its render workers at intervals. RSS should level off after the first
+few hundred renders; steady growth means figures or Agg buffers are being
+kept alive.
+
+    python test/soak_render.py [renders] [dpi]
+"""
+import asyncio
+import multiprocessing
+import os
+import resource
+import sys
+import time
+import warnings
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import numpy as np
+
+import visualization_server as vs
+
+RENDERS = 10000
+DPI = 50
+REPORT_EVERY = 500
+
+def rss_mb(pid='self') -> float:
+    """Current resident set size, falling back to the peak where /proc is missing."""
+    try:
+        with open(f'/proc/{pid}/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def chart_calls(dpi: int):
+    rng = np.random.default_rng(0)
+    x = rng.normal(size=200).tolist()
+    y = rng.normal(size=200).tolist()
+    grid_x, grid_y = np.meshgrid(np.arange(10.0), np.arange(10.0))
+    return [
+        lambda: vs.create_scatter_plot(x, y, labels=[str(i) for i in range(20)], dpi=dpi),
+        lambda: vs.create_line_plot(x, y, dpi=dpi),
+        lambda: vs.create_histogram(x, dpi=dpi),
+        lambda: vs.create_heatmap(rng.random((12, 12)).tolist(), dpi=dpi),
+        lambda: vs.create_classification_plot(x, y, ['a', 'b', 'c', 'd'] * 50, dpi=dpi),
+        lambda: vs.create_relationship_graph(['A', 'B', 'C', 'D'], [['A', 'B'], ['B', 'C'], ['C', 'D']], dpi=dpi),
+        lambda: vs.create_3d_plot(grid_x.ravel().tolist(), grid_y.ravel().tolist(),
+                                  np.sin(grid_x + grid_y).ravel().tolist(), plot_type='surface', dpi=dpi),
+    ]
+
+async def main(renders: int, dpi: int) -> None:
+    calls = chart_calls(dpi)
+    vs._render_cache.budget = 0  # every call repeats its arguments; measure renders, not cache hits
+    start = time.perf_counter()
+    print(f"{'Renders':>8} {'RSS (MB)':>10} {'Workers (MB)':>13} {'Renders/s':>10}")
+    for i in range(1, renders + 1):
+        result = await calls[i % len(calls)]()
+        if isinstance(result, str):
+            raise SystemExit(result)
+        if i % REPORT_EVERY == 0 or i == renders:
+            workers = sum(rss_mb(p.pid) for p in multiprocessing.active_children())
+            print(f"{i:>8} {rss_mb():>10.1f} {workers:>13.1f} {i / (time.perf_counter() - start):>10.1f}")
+
+if __name__ == "__main__":
+    renders = int(sys.argv[1]) if len(sys.argv) > 1 else RENDERS
+    dpi = int(sys.argv[2]) if len(sys.argv) > 2 else DPI
+    # Missing CJK glyphs on fontless hosts; the environment variable reaches the workers
+    warnings.simplefilter('ignore', UserWarning)
+    os.environ['PYTHONWARNINGS'] = 'ignore::UserWarning'
+    asyncio.run(main(renders, dpi))
@@ -1,48 +1,533 @@
-import matplotlib.pyplot as plt
+import matplotlib
+matplotlib.use('Agg')  # 服务器进程没有显示器，只使用无界面的Agg后端
+from matplotlib.figure import Figure, SubplotParams
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 from mpl_toolkits.mplot3d import Axes3D
-from matplotlib.animation import FuncAnimation
 import numpy as np
 import pandas as pd
 import networkx as nx
-from typing import Any, List, Optional, Union
+from typing import Any, Callable, Dict, List, Optional, Union
+import asyncio
+import hashlib
+import io
 import json
+import multiprocessing
+import struct
 import tempfile
+import threading
+import time
 import os
-from datetime import datetime
-from mcp.server.fastmcp import FastMCP
+from collections import OrderedDict
+from mcp.server.fastmcp import FastMCP, Image
 
 # Initialize FastMCP server
 mcp = FastMCP("visualization")
 
-def save_and_show_plot(title: str = "plot") -> str:
-    """保存图表到临时目录并显示"""
-    # 创建临时目录
-    temp_dir = tempfile.gettempdir()
+# Rendering limits
+DEFAULT_DPI = 100  # 图像直接随工具结果返回，默认分辨率不宜过大
+MAX_DPI = 600
+MAX_FIGURE_INCHES = 40
+MAX_FIGURE_PIXELS = 50_000_000  # 宽 x 高 x dpi² 的上限，防止单次渲染占满内存
+FIGURE_POOL_SIZE = 2  # 空闲Figure数量；每个Figure会保留一块与输出尺寸相同的Agg缓冲区
+
+# Render worker pool
+RENDER_WORKERS = min(4, os.cpu_count() or 1)  # 0表示在线程中渲染，不启动子进程
+RENDER_QUEUE_SIZE = 16  # 等待空闲进程的渲染请求上限，超出时直接拒绝
+RENDER_TIMEOUT = 60  # 单次渲染的超时时间（秒），超时的进程会被杀掉并替换
+
+# Level of detail for large scatter and line plots
+LINE_DECIMATION_THRESHOLD = 10_000  # 超过该点数的折线按像素列做最小/最大值降采样
+LINE_MARKER_LIMIT = 1_000  # 超过该点数的折线不再绘制数据点标记
+SCATTER_DENSITY_THRESHOLD = 50_000  # 超过该点数的散点图改为六边形密度图
+MAX_SCATTER_LABELS = 200  # 允许降采样时最多标注的数据点数量
+
+# Rendered image cache
+RENDER_CACHE_BYTES = 64 * 1024 * 1024  # 64MB of PNG data
+
+# On-disk image store, used only when a tool is called with save_file=True
+IMAGE_STORE_DIR = os.path.join(tempfile.gettempdir(), 'mcp-visualization')
+IMAGE_STORE_MAX_BYTES = 256 * 1024 * 1024  # 256MB
+IMAGE_STORE_MAX_AGE = 7 * 24 * 3600  # seconds
+
+# 工具返回说明文字和图像内容；出错时只返回错误信息
+PlotResult = Union[str, List[Union[str, Image]]]
+
+class FigurePool:
+    """回收Agg Figure对象
+    
+    Figure不经过pyplot创建，因此不会被全局的图表管理器持有；每次渲染结束后
+    清空并放回池中，下次同尺寸渲染可以复用已有的Agg缓冲区。
+    """
+    
+    def __init__(self, size: int = FIGURE_POOL_SIZE):
+        self.size = size
+        self._free: List[Figure] = []
+        self._lock = threading.Lock()
+    
+    def acquire(self, width: float, height: float, dpi: int) -> Figure:
+        """取出一个空Figure并设置尺寸和分辨率"""
+        with self._lock:
+            fig = self._free.pop() if self._free else None
+        if fig is None:
+            fig = Figure()
+            FigureCanvasAgg(fig)
+        fig.set_dpi(dpi)
+        fig.set_size_inches(width, height)
+        return fig
+    
+    def release(self, fig: Figure) -> None:
+        """清空Figure上的所有坐标轴和图元，放回池中或直接丢弃"""
+        fig.clear()
+        # tight_layout会改写子图边距，clear()不会恢复，需要重置为默认值
+        fig.subplotpars = SubplotParams()
+        with self._lock:
+            if len(self._free) < self.size:
+                self._free.append(fig)
+
+_figure_pool = FigurePool()
+
+def check_figure_size(width: float, height: float, dpi: int) -> None:
+    """检查调用方给出的图表尺寸和分辨率"""
+    if not 0 < dpi <= MAX_DPI:
+        raise ValueError(f"dpi必须在1到{MAX_DPI}之间")
+    if not (0 < width <= MAX_FIGURE_INCHES and 0 < height <= MAX_FIGURE_INCHES):
+        raise ValueError(f"图表宽高必须在0到{MAX_FIGURE_INCHES}英寸之间")
+    if width * height * dpi * dpi > MAX_FIGURE_PIXELS:
+        raise ValueError(f"图表像素过多: {int(width * dpi)}x{int(height * dpi)}")
+
+# 每个线程复用一块PNG编码缓冲区
+_png_buffers = threading.local()
+
+def encode_png(fig: Figure, dpi: int) -> bytes:
+    """把图表编码为PNG字节"""
+    buffer = getattr(_png_buffers, 'buffer', None)
+    if buffer is None:
+        buffer = _png_buffers.buffer = io.BytesIO()
+    buffer.seek(0)
+    buffer.truncate()
+    fig.savefig(buffer, format='png', dpi=dpi, bbox_inches='tight')
+    return buffer.getvalue()
+
+def render_plot(draw: Callable[..., None], width: float, height: float,
+                dpi: int = DEFAULT_DPI, **kwargs) -> bytes:
+    """在回收的Figure上调用draw(fig, **kwargs)绘图并编码为PNG，结束后确定性地释放Figure"""
+    check_figure_size(width, height, dpi)
+    fig = _figure_pool.acquire(width, height, dpi)
+    try:
+        draw(fig, **kwargs)
+        return encode_png(fig, dpi)
+    finally:
+        _figure_pool.release(fig)
+
+def png_size(png: bytes) -> tuple:
+    """从PNG的IHDR块读取像素宽高"""
+    return struct.unpack('>II', png[16:24])
+
+class ImageStore:
+    """按内容哈希命名的图片目录
+    
+    相同的图片只保存一份；总大小超过上限或文件超过保存期限时，按最后使用时间
+    从旧到新删除。只管理目录中由本类写入的PNG文件。
+    """
     
-    # 生成带时间戳的文件名
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    filename = f"{title}_{timestamp}.png"
-    filepath = os.path.join(temp_dir, filename)
+    def __init__(self, directory: str = IMAGE_STORE_DIR, max_bytes: int = IMAGE_STORE_MAX_BYTES,
+                 max_age: float = IMAGE_STORE_MAX_AGE):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.total_bytes = 0
+        self._files: Optional[OrderedDict] = None  # 文件名 -> (大小, 最后使用时间)，按使用时间排序
+        self._lock = threading.Lock()
     
-    # 保存图片
-    plt.savefig(filepath, format='png', dpi=300, bbox_inches='tight')
+    def _load(self) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        entries = []
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if entry.name.endswith('.png') and len(entry.name) == 68 and entry.is_file():
+                    st = entry.stat()
+                    entries.append((st.st_mtime, entry.name, st.st_size))
+        entries.sort()
+        self._files = OrderedDict((name, (size, mtime)) for mtime, name, size in entries)
+        self.total_bytes = sum(size for _, _, size in entries)
     
-    # 显示图片
-    plt.show()
+    def _evict(self, now: float) -> None:
+        while self._files and (self.total_bytes > self.max_bytes
+                               or now - next(iter(self._files.values()))[1] > self.max_age):
+            name, (size, _) = self._files.popitem(last=False)
+            self.total_bytes -= size
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                pass
     
-    # 不立即关闭，让用户能看到图片
-    # plt.close() 
+    def put(self, png: bytes) -> Optional[str]:
+        """保存图片并返回其路径；已存在时只刷新使用时间，超过目录总大小上限时不保存并返回None"""
+        if len(png) > self.max_bytes:
+            return None
+        name = hashlib.sha256(png).hexdigest() + '.png'
+        path = os.path.join(self.directory, name)
+        with self._lock:
+            if self._files is None:
+                self._load()
+            now = time.time()
+            if name in self._files and os.path.exists(path):
+                os.utime(path, (now, now))
+                self._files.move_to_end(name)
+                self._files[name] = (len(png), now)
+            else:
+                if name in self._files:
+                    self.total_bytes -= self._files.pop(name)[0]
+                temp_path = f"{path}.{os.getpid()}.tmp"
+                try:
+                    with open(temp_path, 'wb') as f:
+                        f.write(png)
+                    os.replace(temp_path, path)
+                except BaseException:
+                    try:
+                        os.remove(temp_path)
+                    except FileNotFoundError:
+                        pass
+                    raise
+                self._files[name] = (len(png), now)
+                self.total_bytes += len(png)
+            self._evict(now)
+        return path
+
+_image_store = ImageStore()
+
+async def plot_result(png: bytes, save_file: bool) -> PlotResult:
+    """把PNG字节转换为工具返回的说明文字和MCP图像内容"""
+    width, height = png_size(png)
+    message = f"图表已生成: {width}x{height}像素，{len(png) / 1024:.1f}KB"
+    if save_file:
+        path = await asyncio.to_thread(_image_store.put, png)
+        if path is None:
+            message += f"，超过图片目录上限（{_image_store.max_bytes / 1024 / 1024:.0f}MB），未保存"
+        else:
+            message += f"，已保存到: {path}"
+    return [message, Image(data=png, format='png')]
+
+def render_worker_main(conn) -> None:
+    """渲染进程主循环：预热matplotlib后逐个执行(draw函数名, 参数)任务"""
+    fig = _figure_pool.acquire(1, 1, DEFAULT_DPI)
+    fig.text(0.5, 0.5, "warm")
+    fig.canvas.draw()
+    _figure_pool.release(fig)
     
-    return f"图表已保存到: {filepath} 并已显示"
+    while True:
+        try:
+            draw_name, width, height, dpi, kwargs = conn.recv()
+        except EOFError:
+            return
+        try:
+            conn.send((True, render_plot(globals()[draw_name], width, height, dpi, **kwargs)))
+        except Exception as e:
+            conn.send((False, str(e)))
 
-@mcp.tool()
+class RenderWorker:
+    """一个常驻的渲染子进程及其管道"""
+    
+    def __init__(self, context):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=render_worker_main, args=(child_conn,), daemon=True)
+        self.process.start()
+        child_conn.close()
+    
+    def call(self, job: tuple) -> tuple:
+        """发送任务并阻塞等待结果，在线程中调用"""
+        self.conn.send(job)
+        return self.conn.recv()
+    
+    def kill(self) -> None:
+        """杀掉进程并等待其退出，在线程中调用；阻塞在管道上的call随之返回"""
+        self.process.kill()
+        self.process.join()
+    
+    def close(self) -> None:
+        """关闭管道；必须在没有线程还在收发时调用"""
+        self.conn.close()
+
+class RenderPool:
+    """常驻渲染进程池
+    
+    工具调用在事件循环之外渲染，多个渲染可以同时占用多个CPU核心。排队的请求
+    数量有上限；超时或被取消的渲染会在后台杀掉所在进程并启动一个新的进程替换它，
+    替换失败时由下一次渲染补上空缺。
+    """
+    
+    def __init__(self, workers: int = RENDER_WORKERS, queue_size: int = RENDER_QUEUE_SIZE):
+        self.workers = workers
+        self.queue_size = queue_size
+        self.waiting = 0
+        self.lost = 0  # 被杀掉后未能重新启动的进程数
+        self._context = multiprocessing.get_context('spawn')
+        self._idle: Optional[asyncio.Queue] = None
+        self._replacing: set = set()
+    
+    def start(self) -> None:
+        """启动并预热全部渲染进程"""
+        if self._idle is None:
+            self._idle = asyncio.Queue()
+            for _ in range(self.workers):
+                self._idle.put_nowait(RenderWorker(self._context))
+    
+    async def render(self, draw: Callable[..., None], width: float, height: float,
+                     dpi: int, timeout: float = RENDER_TIMEOUT, **kwargs) -> bytes:
+        """在空闲的渲染进程中执行render_plot，返回PNG字节"""
+        if self.workers <= 0:
+            return await asyncio.wait_for(
+                asyncio.to_thread(render_plot, draw, width, height, dpi, **kwargs), timeout)
+        
+        if self.waiting >= self.queue_size:
+            raise RuntimeError(f"渲染队列已满（{self.queue_size}个请求在等待），请稍后重试")
+        self.start()
+        if self.lost:
+            self.lost -= 1
+            try:
+                self._idle.put_nowait(await asyncio.to_thread(RenderWorker, self._context))
+            except Exception:
+                self.lost += 1
+                raise RuntimeError("无法启动渲染进程") from None
+        self.waiting += 1
+        try:
+            worker = await self._idle.get()
+        finally:
+            self.waiting -= 1
+        
+        job = (draw.__name__, width, height, dpi, kwargs)
+        call = asyncio.ensure_future(asyncio.to_thread(worker.call, job))
+        try:
+            # 屏蔽取消：超时后线程仍阻塞在管道上，替换进程时要等它返回
+            ok, result = await asyncio.wait_for(asyncio.shield(call), timeout)
+        except BaseException as e:
+            # 超时、取消或进程崩溃后，进程状态未知，在后台替换
+            task = asyncio.create_task(self._replace(worker, call))
+            self._replacing.add(task)
+            task.add_done_callback(self._replacing.discard)
+            if isinstance(e, asyncio.TimeoutError):
+                raise RuntimeError(f"渲染超时（超过{timeout}秒）") from None
+            if isinstance(e, (EOFError, OSError)):
+                raise RuntimeError("渲染进程意外退出") from None
+            raise
+        self._idle.put_nowait(worker)
+        
+        if not ok:
+            raise RuntimeError(result)
+        return result
+
+    async def _replace(self, worker: RenderWorker, call: asyncio.Future) -> None:
+        """杀掉进程，等阻塞的call返回后关闭管道，再启动新进程放回空闲队列"""
+        try:
+            await asyncio.to_thread(worker.kill)
+            await asyncio.gather(call, return_exceptions=True)
+            worker.close()
+            replacement = await asyncio.to_thread(RenderWorker, self._context)
+        except Exception:
+            self.lost += 1
+            return
+        self._idle.put_nowait(replacement)
+
+_render_pool = RenderPool()
+
+def hash_value(h: Any, value: Any) -> None:
+    """把一个参数值规范化后写入哈希；数值数组按float64字节计算，避免逐个转成文本"""
+    if isinstance(value, (list, tuple)) and value:
+        try:
+            array = np.asarray(value)
+        except ValueError:
+            array = None
+        if array is not None and array.dtype.kind in 'iuf':
+            array = np.ascontiguousarray(array, dtype=np.float64)
+            h.update(b'a' + repr(array.shape).encode())
+            h.update(array.tobytes())
+            return
+    h.update(b'j' + json.dumps(value, sort_keys=True, ensure_ascii=False, default=str).encode())
+
+def render_key(draw: Callable[..., None], width: float, height: float, dpi: int, kwargs: dict) -> str:
+    """按图表类型、尺寸和全部绘图参数计算缓存键"""
+    h = hashlib.sha256()
+    h.update(f"{draw.__name__}|{float(width)!r}|{float(height)!r}|{int(dpi)}".encode())
+    for name in sorted(kwargs):
+        h.update(b'|' + name.encode() + b'=')
+        hash_value(h, kwargs[name])
+    return h.hexdigest()
+
+class RenderCache:
+    """在内存预算内按LRU保存渲染好的PNG
+
+    参数完全相同的请求直接返回缓存的图像，不再经过渲染进程。
+    """
+    
+    def __init__(self, budget: int = RENDER_CACHE_BYTES):
+        self.budget = budget
+        self.used = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.renders = 0
+        self.render_time = 0.0  # 未命中后实际渲染的总时间（秒）
+        self.entries: "OrderedDict[str, bytes]" = OrderedDict()
+    
+    def get(self, key: str) -> Optional[bytes]:
+        png = self.entries.get(key)
+        if png is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return png
+    
+    def put(self, key: str, png: bytes) -> None:
+        if len(png) > self.budget or key in self.entries:
+            return
+        self.entries[key] = png
+        self.used += len(png)
+        while self.used > self.budget:
+            _, evicted = self.entries.popitem(last=False)
+            self.used -= len(evicted)
+            self.evictions += 1
+
+_render_cache = RenderCache()
+
+# 正在进行的渲染：缓存键 -> 渲染任务，渲染任务 -> 等待者数量
+_render_in_flight: Dict[str, asyncio.Task] = {}
+_render_waiters: Dict[asyncio.Task, int] = {}
+
+async def render_chart(draw: Callable[..., None], width: float, height: float, dpi: int, **kwargs) -> bytes:
+    """返回图表的PNG字节，优先使用渲染缓存
+
+    缓存键在线程中计算，大数组的哈希不会阻塞事件循环。参数相同的请求同时未命中时
+    只渲染一次，后来的请求等待第一次渲染的结果；所有等待者都取消后渲染才会取消。
+    """
+    key = await asyncio.to_thread(render_key, draw, width, height, dpi, kwargs)
+    png = _render_cache.get(key)
+    if png is not None:
+        return png
+    
+    task = _render_in_flight.get(key)
+    if task is None:
+        task = asyncio.create_task(render_and_cache(key, draw, width, height, dpi, kwargs))
+        _render_in_flight[key] = task
+        task.add_done_callback(lambda done: _render_in_flight.pop(key, None)
+                               if _render_in_flight.get(key) is done else None)
+    _render_waiters[task] = _render_waiters.get(task, 0) + 1
+    try:
+        return await asyncio.shield(task)
+    finally:
+        _render_waiters[task] -= 1
+        if not _render_waiters[task]:
+            del _render_waiters[task]
+            task.cancel()
+
+async def render_and_cache(key: str, draw: Callable[..., None], width: float, height: float,
+                           dpi: int, kwargs: dict) -> bytes:
+    """渲染一次并写入缓存，由render_chart在独立任务中运行"""
+    start = time.perf_counter()
+    png = await _render_pool.render(draw, width, height, dpi, **kwargs)
+    _render_cache.renders += 1
+    _render_cache.render_time += time.perf_counter() - start
+    _render_cache.put(key, png)
+    return png
+
+def view_mask(x: np.ndarray, y: np.ndarray, x_limits: Optional[List[float]],
+              y_limits: Optional[List[float]]) -> Optional[np.ndarray]:
+    """落在显示范围内的数据点的布尔掩码；没有指定范围时返回None"""
+    mask = None
+    for values, limits in ((x, x_limits), (y, y_limits)):
+        if limits:
+            low, high = min(limits), max(limits)
+            inside = (values >= low) & (values <= high)
+            mask = inside if mask is None else mask & inside
+    return mask
+
+def minmax_decimate(x: np.ndarray, y: np.ndarray, buckets: int,
+                    x_range: Optional[List[float]] = None) -> tuple:
+    """把x轴范围等分成buckets个像素列，每列只保留首尾点和y最小、最大的点
+
+    按数据顺序把落在同一列的相邻点归为一段，x不均匀甚至不单调时每段也只覆盖
+    一个像素列。降采样后的折线与原折线画出来的包络相同，峰值和谷值不会被平均掉。
+    x_range为坐标轴的x范围，默认取有限x值的最小值和最大值；x或y为NaN、inf的点
+    原样保留，让折线在那里断开。
+    """
+    n = len(y)
+    if n <= 2 * buckets:
+        return x, y
+    finite = np.isfinite(x)
+    if x_range:
+        x0, x1 = min(x_range), max(x_range)
+    elif finite.any():
+        x0, x1 = x[finite].min(), x[finite].max()
+    else:
+        return x, y
+    if not x1 > x0:
+        return x, y
+    # 范围外的点（裁剪时保留的两端各一个点）各归入两侧的一列；非有限的点各自成段
+    with np.errstate(invalid='ignore'):
+        columns = np.clip(np.floor((x - x0) / (x1 - x0) * buckets), -1, buckets)
+    columns[x == x1] = buckets - 1
+    columns[~finite] = np.nan
+    starts = np.flatnonzero(np.r_[True, columns[1:] != columns[:-1]])
+    ends = np.r_[starts[1:], n] - 1
+    run = np.repeat(np.arange(len(starts)), ends - starts + 1)
+    keep = [starts, ends, np.flatnonzero(~finite | ~np.isfinite(y))]
+    for extreme in (np.fmin.reduceat(y, starts), np.fmax.reduceat(y, starts)):
+        hits = np.flatnonzero(y == extreme[run])
+        keep.append(hits[np.unique(run[hits], return_index=True)[1]])
+    keep = np.unique(np.concatenate(keep))
+    return x[keep], y[keep]
+
+def note_downsampling(ax, shown: int, total: int, how: str) -> None:
+    """在坐标轴右下角注明降采样方式和点数"""
+    ax.text(0.99, 0.01, f"{how}: {total:,}点 → {shown:,}点", transform=ax.transAxes,
+            ha='right', va='bottom', fontsize=8, alpha=0.6)
+
+def draw_relationship_graph(fig: Figure, nodes: List[str], edges: List[List[str]],
+                            title: str, node_size: int, font_size: int) -> None:
+    """绘制节点关系图"""
+    # 创建有向图
+    G = nx.DiGraph()
+    
+    # 添加节点
+    G.add_nodes_from(nodes)
+    
+    # 添加边
+    for edge in edges:
+        if len(edge) >= 2:
+            G.add_edge(edge[0], edge[1])
+    
+    ax = fig.add_subplot(111)
+    
+    # 使用spring布局
+    pos = nx.spring_layout(G, k=2, iterations=50)
+    
+    # 绘制节点
+    nx.draw_networkx_nodes(G, pos, ax=ax, node_color='lightblue',
+                          node_size=node_size, alpha=0.8)
+    
+    # 绘制边
+    nx.draw_networkx_edges(G, pos, ax=ax, edge_color='gray',
+                          arrows=True, arrowsize=20, arrowstyle='->')
+    
+    # 绘制标签
+    nx.draw_networkx_labels(G, pos, ax=ax, font_size=font_size, font_weight='bold')
+    
+    ax.set_title(title, fontsize=16, fontweight='bold')
+    ax.axis('off')
+    fig.tight_layout()
+
+@mcp.tool(structured_output=False)
 async def create_relationship_graph(
-    nodes: List[str], 
-    edges: List[List[str]], 
+    nodes: List[str],
+    edges: List[List[str]],
     title: str = "关系图",
     node_size: int = 1000,
-    font_size: int = 12
-) -> str:
+    font_size: int = 12,
+    width: float = 10,
+    height: float = 8,
+    dpi: int = DEFAULT_DPI,
+    save_file: bool = False
+) -> PlotResult:
     """创建节点关系图
     
     Args:
@@ -51,49 +536,80 @@ async def create_relationship_graph(
         title: 图表标题
         node_size: 节点大小
         font_size: 字体大小
+        width: 图表宽度（英寸）
+        height: 图表高度（英寸）
+        dpi: 输出分辨率
+        save_file: 是否同时把PNG保存到本地图片目录
     
     Returns:
-        base64编码的图像字符串
+        图表的PNG图像内容及说明文字
     """
     try:
-        # 创建有向图
-        G = nx.DiGraph()
-        
-        # 添加节点
-        G.add_nodes_from(nodes)
-        
-        # 添加边
-        for edge in edges:
-            if len(edge) >= 2:
-                G.add_edge(edge[0], edge[1])
-        
-        # 创建图形
-        plt.figure(figsize=(10, 8))
-        
-        # 使用spring布局
-        pos = nx.spring_layout(G, k=2, iterations=50)
-        
-        # 绘制节点
-        nx.draw_networkx_nodes(G, pos, node_color='lightblue', 
-                              node_size=node_size, alpha=0.8)
-        
-        # 绘制边
-        nx.draw_networkx_edges(G, pos, edge_color='gray', 
-                              arrows=True, arrowsize=20, arrowstyle='->')
-        
-        # 绘制标签
-        nx.draw_networkx_labels(G, pos, font_size=font_size, font_weight='bold')
-        
-        plt.title(title, fontsize=16, fontweight='bold')
-        plt.axis('off')
-        plt.tight_layout()
-        
-        return save_and_show_plot("relationship_graph")
-        
+        png = await render_chart(draw_relationship_graph, width, height, dpi,
+                                 nodes=nodes, edges=edges, title=title,
+                                 node_size=node_size, font_size=font_size)
+        return await plot_result(png, save_file)
+    
     except Exception as e:
         return f"创建关系图时出错: {str(e)}"
 
-@mcp.tool()
+def draw_scatter_plot(fig: Figure, x_data: List[float], y_data: List[float],
+                      labels: Optional[List[str]], colors: Optional[List[str]],
+                      title: str, x_label: str, y_label: str, size: int,
+                      x_limits: Optional[List[float]] = None, y_limits: Optional[List[float]] = None,
+                      downsample: bool = True) -> None:
+    """绘制散点图"""
+    ax = fig.add_subplot(111)
+    
+    count = min(len(x_data), len(y_data))
+    x = np.asarray(x_data[:count], dtype=float)
+    y = np.asarray(y_data[:count], dtype=float)
+    index = np.arange(count)
+    
+    # 只保留显示范围内的点
+    mask = view_mask(x, y, x_limits, y_limits)
+    if mask is not None:
+        x, y, index = x[mask], y[mask], index[mask]
+    
+    if downsample and len(x) > SCATTER_DENSITY_THRESHOLD:
+        # 点太多时逐点绘制既慢又会糊成一片，改为按密度着色的六边形网格
+        gridsize = max(20, int(fig.get_figwidth() * fig.dpi / 10))
+        hexbin = ax.hexbin(x, y, gridsize=gridsize, bins='log', mincnt=1, cmap='viridis')
+        fig.colorbar(hexbin, ax=ax, label='点数')
+        note_downsampling(ax, len(hexbin.get_offsets()), len(x), "密度图")
+    else:
+        # 如果没有提供颜色，使用默认颜色
+        if colors is None:
+            point_colors = 'blue'
+        elif mask is not None and len(colors) == count:
+            point_colors = [colors[i] for i in index]
+        else:
+            point_colors = colors
+        
+        # 创建散点图
+        ax.scatter(x, y, c=point_colors, s=size, alpha=0.7, edgecolors='black', linewidth=0.5)
+        
+        # 添加标签（如果提供），只标注可见的点；允许降采样时，数量过多则均匀抽取
+        if labels:
+            visible = index[index < len(labels)]
+            if downsample and len(visible) > MAX_SCATTER_LABELS:
+                visible = visible[np.linspace(0, len(visible) - 1, MAX_SCATTER_LABELS).astype(int)]
+            for i in visible:
+                ax.annotate(labels[i], (x_data[i], y_data[i]),
+                           xytext=(5, 5), textcoords='offset points',
+                           fontsize=10, alpha=0.8)
+    
+    if x_limits:
+        ax.set_xlim(min(x_limits), max(x_limits))
+    if y_limits:
+        ax.set_ylim(min(y_limits), max(y_limits))
+    ax.set_xlabel(x_label, fontsize=12)
+    ax.set_ylabel(y_label, fontsize=12)
+    ax.set_title(title, fontsize=16, fontweight='bold')
+    ax.grid(True, alpha=0.3)
+    fig.tight_layout()
+
+@mcp.tool(structured_output=False)
 async def create_scatter_plot(
     x_data: List[float],
     y_data: List[float],
@@ -102,8 +618,15 @@ async def create_scatter_plot(
     title: str = "散点图",
     x_label: str = "X轴",
     y_label: str = "Y轴",
-    size: int = 50
-) -> str:
+    size: int = 50,
+    x_limits: Optional[List[float]] = None,
+    y_limits: Optional[List[float]] = None,
+    downsample: bool = True,
+    width: float = 10,
+    height: float = 8,
+    dpi: int = DEFAULT_DPI,
+    save_file: bool = False
+) -> PlotResult:
     """创建散点图
     
     Args:
@@ -115,40 +638,70 @@ async def create_scatter_plot(
         x_label: X轴标签
         y_label: Y轴标签
         size: 点的大小
+        x_limits: X轴显示范围 [最小值, 最大值]（可选），只绘制和标注范围内的点
+        y_limits: Y轴显示范围 [最小值, 最大值]（可选）
+        downsample: 点数超过阈值时改为密度图，标签过多时只标注均匀抽取的一部分
+        width: 图表宽度（英寸）
+        height: 图表高度（英寸）
+        dpi: 输出分辨率
+        save_file: 是否同时把PNG保存到本地图片目录
     
     Returns:
-        base64编码的图像字符串
+        图表的PNG图像内容及说明文字
     """
     try:
-        plt.figure(figsize=(10, 8))
-        
-        # 如果没有提供颜色，使用默认颜色
-        if colors is None:
-            colors = ['blue'] * len(x_data)
-        
-        # 创建散点图
-        scatter = plt.scatter(x_data, y_data, c=colors, s=size, alpha=0.7, edgecolors='black', linewidth=0.5)
-        
-        # 添加标签（如果提供）
-        if labels:
-            for i, label in enumerate(labels):
-                if i < len(x_data) and i < len(y_data):
-                    plt.annotate(label, (x_data[i], y_data[i]), 
-                               xytext=(5, 5), textcoords='offset points',
-                               fontsize=10, alpha=0.8)
-        
-        plt.xlabel(x_label, fontsize=12)
-        plt.ylabel(y_label, fontsize=12)
-        plt.title(title, fontsize=16, fontweight='bold')
-        plt.grid(True, alpha=0.3)
-        plt.tight_layout()
-        
-        return save_and_show_plot("scatter_plot")
-        
+        png = await render_chart(draw_scatter_plot, width, height, dpi,
+                                 x_data=x_data, y_data=y_data, labels=labels, colors=colors,
+                                 title=title, x_label=x_label, y_label=y_label, size=size,
+                                 x_limits=x_limits, y_limits=y_limits, downsample=downsample)
+        return await plot_result(png, save_file)
+    
     except Exception as e:
         return f"创建散点图时出错: {str(e)}"
 
-@mcp.tool()
+def draw_3d_plot(fig: Figure, x_data: List[float], y_data: List[float], z_data: List[float],
+                 plot_type: str, title: str, x_label: str, y_label: str, z_label: str) -> None:
+    """绘制3D图"""
+    ax = fig.add_subplot(111, projection='3d')
+    
+    if plot_type == "scatter":
+        ax.scatter(x_data, y_data, z_data, c=z_data, cmap='viridis', s=50)
+    
+    elif plot_type == "surface":
+        # 尝试重塑数据为2D网格
+        unique_x = sorted(set(x_data))
+        unique_y = sorted(set(y_data))
+        
+        if len(unique_x) * len(unique_y) == len(z_data):
+            X = np.array(unique_x)
+            Y = np.array(unique_y)
+            X, Y = np.meshgrid(X, Y)
+            Z = np.array(z_data).reshape(len(unique_y), len(unique_x))
+            ax.plot_surface(X, Y, Z, cmap='viridis', alpha=0.8)
+        else:
+            # 如果无法创建规则网格，回退到散点图
+            ax.scatter(x_data, y_data, z_data, c=z_data, cmap='viridis', s=50)
+    
+    elif plot_type == "wireframe":
+        # 类似surface的处理
+        unique_x = sorted(set(x_data))
+        unique_y = sorted(set(y_data))
+        
+        if len(unique_x) * len(unique_y) == len(z_data):
+            X = np.array(unique_x)
+            Y = np.array(unique_y)
+            X, Y = np.meshgrid(X, Y)
+            Z = np.array(z_data).reshape(len(unique_y), len(unique_x))
+            ax.plot_wireframe(X, Y, Z, alpha=0.8)
+        else:
+            ax.scatter(x_data, y_data, z_data, c=z_data, cmap='viridis', s=50)
+    
+    ax.set_xlabel(x_label)
+    ax.set_ylabel(y_label)
+    ax.set_zlabel(z_label)
+    ax.set_title(title, fontsize=16, fontweight='bold')
+
+@mcp.tool(structured_output=False)
 async def create_3d_plot(
     x_data: List[float],
     y_data: List[float],
@@ -157,8 +710,12 @@ async def create_3d_plot(
     title: str = "3D图",
     x_label: str = "X轴",
     y_label: str = "Y轴",
-    z_label: str = "Z轴"
-) -> str:
+    z_label: str = "Z轴",
+    width: float = 12,
+    height: float = 9,
+    dpi: int = DEFAULT_DPI,
+    save_file: bool = False
+) -> PlotResult:
     """创建3D图
     
     Args:
@@ -170,70 +727,62 @@ async def create_3d_plot(
         x_label: X轴标签
         y_label: Y轴标签
         z_label: Z轴标签
+        width: 图表宽度（英寸）
+        height: 图表高度（英寸）
+        dpi: 输出分辨率
+        save_file: 是否同时把PNG保存到本地图片目录
     
     Returns:
-        base64编码的图像字符串
+        图表的PNG图像内容及说明文字
     """
     try:
-        fig = plt.figure(figsize=(12, 9))
-        ax = fig.add_subplot(111, projection='3d')
-        
-        if plot_type == "scatter":
-            ax.scatter(x_data, y_data, z_data, c=z_data, cmap='viridis', s=50)
-            
-        elif plot_type == "surface":
-            # 为表面图创建网格
-            x_array = np.array(x_data)
-            y_array = np.array(y_data)
-            z_array = np.array(z_data)
-            
-            # 尝试重塑数据为2D网格
-            unique_x = sorted(set(x_data))
-            unique_y = sorted(set(y_data))
-            
-            if len(unique_x) * len(unique_y) == len(z_data):
-                X = np.array(unique_x)
-                Y = np.array(unique_y)
-                X, Y = np.meshgrid(X, Y)
-                Z = np.array(z_data).reshape(len(unique_y), len(unique_x))
-                ax.plot_surface(X, Y, Z, cmap='viridis', alpha=0.8)
-            else:
-                # 如果无法创建规则网格，回退到散点图
-                ax.scatter(x_data, y_data, z_data, c=z_data, cmap='viridis', s=50)
-                
-        elif plot_type == "wireframe":
-            # 类似surface的处理
-            unique_x = sorted(set(x_data))
-            unique_y = sorted(set(y_data))
-            
-            if len(unique_x) * len(unique_y) == len(z_data):
-                X = np.array(unique_x)
-                Y = np.array(unique_y)
-                X, Y = np.meshgrid(X, Y)
-                Z = np.array(z_data).reshape(len(unique_y), len(unique_x))
-                ax.plot_wireframe(X, Y, Z, alpha=0.8)
-            else:
-                ax.scatter(x_data, y_data, z_data, c=z_data, cmap='viridis', s=50)
-        
-        ax.set_xlabel(x_label)
-        ax.set_ylabel(y_label)
-        ax.set_zlabel(z_label)
-        ax.set_title(title, fontsize=16, fontweight='bold')
-        
-        return save_and_show_plot("3d_plot")
-        
+        png = await render_chart(draw_3d_plot, width, height, dpi,
+                                 x_data=x_data, y_data=y_data, z_data=z_data, plot_type=plot_type,
+                                 title=title, x_label=x_label, y_label=y_label, z_label=z_label)
+        return await plot_result(png, save_file)
+    
     except Exception as e:
         return f"创建3D图时出错: {str(e)}"
 
-@mcp.tool()
+def draw_classification_plot(fig: Figure, x_data: List[float], y_data: List[float],
+                             categories: List[str], title: str, x_label: str, y_label: str) -> None:
+    """绘制分类散点图"""
+    ax = fig.add_subplot(111)
+    
+    # 获取唯一的分类
+    unique_categories = list(set(categories))
+    colors = matplotlib.colormaps['Set1'](np.linspace(0, 1, len(unique_categories)))
+    
+    # 为每个类别绘制散点
+    for i, category in enumerate(unique_categories):
+        # 找出属于当前类别的数据点
+        mask = [cat == category for cat in categories]
+        x_cat = [x for x, m in zip(x_data, mask) if m]
+        y_cat = [y for y, m in zip(y_data, mask) if m]
+        
+        ax.scatter(x_cat, y_cat, c=[colors[i]], label=category,
+                   s=60, alpha=0.7, edgecolors='black', linewidth=0.5)
+    
+    ax.set_xlabel(x_label, fontsize=12)
+    ax.set_ylabel(y_label, fontsize=12)
+    ax.set_title(title, fontsize=16, fontweight='bold')
+    ax.legend(bbox_to_anchor=(1.05, 1), loc='upper left')
+    ax.grid(True, alpha=0.3)
+    fig.tight_layout()
+
+@mcp.tool(structured_output=False)
 async def create_classification_plot(
     x_data: List[float],
     y_data: List[float],
     categories: List[str],
     title: str = "分类散点图",
     x_label: str = "特征1",
-    y_label: str = "特征2"
-) -> str:
+    y_label: str = "特征2",
+    width: float = 10,
+    height: float = 8,
+    dpi: int = DEFAULT_DPI,
+    save_file: bool = False
+) -> PlotResult:
     """创建分类散点图
     
     Args:
@@ -243,47 +792,47 @@ async def create_classification_plot(
         title: 图表标题
         x_label: X轴标签
         y_label: Y轴标签
+        width: 图表宽度（英寸）
+        height: 图表高度（英寸）
+        dpi: 输出分辨率
+        save_file: 是否同时把PNG保存到本地图片目录
     
     Returns:
-        base64编码的图像字符串
+        图表的PNG图像内容及说明文字
     """
     try:
-        plt.figure(figsize=(10, 8))
-        
-        # 获取唯一的分类
-        unique_categories = list(set(categories))
-        colors = plt.cm.Set1(np.linspace(0, 1, len(unique_categories)))
-        
-        # 为每个类别绘制散点
-        for i, category in enumerate(unique_categories):
-            # 找出属于当前类别的数据点
-            mask = [cat == category for cat in categories]
-            x_cat = [x for x, m in zip(x_data, mask) if m]
-            y_cat = [y for y, m in zip(y_data, mask) if m]
-            
-            plt.scatter(x_cat, y_cat, c=[colors[i]], label=category, 
-                       s=60, alpha=0.7, edgecolors='black', linewidth=0.5)
-        
-        plt.xlabel(x_label, fontsize=12)
-        plt.ylabel(y_label, fontsize=12)
-        plt.title(title, fontsize=16, fontweight='bold')
-        plt.legend(bbox_to_anchor=(1.05, 1), loc='upper left')
-        plt.grid(True, alpha=0.3)
-        plt.tight_layout()
-        
-        return save_and_show_plot("classification_plot")
-        
+        png = await render_chart(draw_classification_plot, width, height, dpi,
+                                 x_data=x_data, y_data=y_data, categories=categories,
+                                 title=title, x_label=x_label, y_label=y_label)
+        return await plot_result(png, save_file)
+    
     except Exception as e:
         return f"创建分类图时出错: {str(e)}"
 
-@mcp.tool()
+def draw_histogram(fig: Figure, data: List[float], bins: int,
+                   title: str, x_label: str, y_label: str) -> None:
+    """绘制直方图"""
+    ax = fig.add_subplot(111)
+    
+    ax.hist(data, bins=bins, alpha=0.7, color='skyblue', edgecolor='black', linewidth=0.5)
+    ax.set_xlabel(x_label, fontsize=12)
+    ax.set_ylabel(y_label, fontsize=12)
+    ax.set_title(title, fontsize=16, fontweight='bold')
+    ax.grid(True, alpha=0.3, axis='y')
+    fig.tight_layout()
+
+@mcp.tool(structured_output=False)
 async def create_histogram(
     data: List[float],
     bins: int = 30,
     title: str = "直方图",
     x_label: str = "值",
-    y_label: str = "频次"
-) -> str:
+    y_label: str = "频次",
+    width: float = 10,
+    height: float = 6,
+    dpi: int = DEFAULT_DPI,
+    save_file: bool = False
+) -> PlotResult:
     """创建直方图
     
     Args:
@@ -292,26 +841,59 @@ async def create_histogram(
         title: 图表标题
         x_label: X轴标签
         y_label: Y轴标签
+        width: 图表宽度（英寸）
+        height: 图表高度（英寸）
+        dpi: 输出分辨率
+        save_file: 是否同时把PNG保存到本地图片目录
     
     Returns:
-        base64编码的图像字符串
+        图表的PNG图像内容及说明文字
     """
     try:
-        plt.figure(figsize=(10, 6))
-        
-        plt.hist(data, bins=bins, alpha=0.7, color='skyblue', edgecolor='black', linewidth=0.5)
-        plt.xlabel(x_label, fontsize=12)
-        plt.ylabel(y_label, fontsize=12)
-        plt.title(title, fontsize=16, fontweight='bold')
-        plt.grid(True, alpha=0.3, axis='y')
-        plt.tight_layout()
-        
-        return save_and_show_plot("histogram")
-        
+        png = await render_chart(draw_histogram, width, height, dpi,
+                                 data=data, bins=bins, title=title, x_label=x_label, y_label=y_label)
+        return await plot_result(png, save_file)
+    
     except Exception as e:
         return f"创建直方图时出错: {str(e)}"
 
-@mcp.tool()
+def draw_line_plot(fig: Figure, x_data: List[float], y_data: List[float], title: str,
+                   x_label: str, y_label: str, line_style: str, color: str,
+                   x_limits: Optional[List[float]] = None, y_limits: Optional[List[float]] = None,
+                   downsample: bool = True) -> None:
+    """绘制折线图"""
+    ax = fig.add_subplot(111)
+    
+    count = min(len(x_data), len(y_data))
+    x = np.asarray(x_data[:count], dtype=float)
+    y = np.asarray(y_data[:count], dtype=float)
+    
+    # 只按x范围裁剪，保留范围两侧各一个点，让折线一直连到坐标轴边缘
+    if x_limits and count:
+        inside = np.flatnonzero(view_mask(x, y, x_limits, None))
+        if len(inside):
+            start, stop = max(inside[0] - 1, 0), min(inside[-1] + 2, count)
+            x, y = x[start:stop], y[start:stop]
+    
+    total = len(x)
+    if downsample and total > LINE_DECIMATION_THRESHOLD:
+        # 每个像素列保留最小值和最大值
+        x, y = minmax_decimate(x, y, int(fig.get_figwidth() * fig.dpi), x_limits)
+        note_downsampling(ax, len(x), total, "最小/最大值降采样")
+    
+    marker = 'o' if total <= LINE_MARKER_LIMIT else None
+    ax.plot(x, y, linestyle=line_style, color=color, linewidth=2, marker=marker, markersize=4)
+    if x_limits:
+        ax.set_xlim(min(x_limits), max(x_limits))
+    if y_limits:
+        ax.set_ylim(min(y_limits), max(y_limits))
+    ax.set_xlabel(x_label, fontsize=12)
+    ax.set_ylabel(y_label, fontsize=12)
+    ax.set_title(title, fontsize=16, fontweight='bold')
+    ax.grid(True, alpha=0.3)
+    fig.tight_layout()
+
+@mcp.tool(structured_output=False)
 async def create_line_plot(
     x_data: List[float],
     y_data: List[float],
@@ -319,8 +901,15 @@ async def create_line_plot(
     x_label: str = "X轴",
     y_label: str = "Y轴",
     line_style: str = "-",
-    color: str = "blue"
-) -> str:
+    color: str = "blue",
+    x_limits: Optional[List[float]] = None,
+    y_limits: Optional[List[float]] = None,
+    downsample: bool = True,
+    width: float = 10,
+    height: float = 6,
+    dpi: int = DEFAULT_DPI,
+    save_file: bool = False
+) -> PlotResult:
     """创建折线图
     
     Args:
@@ -331,33 +920,55 @@ async def create_line_plot(
         y_label: Y轴标签
         line_style: 线条样式 ("-", "--", "-.", ":")
         color: 线条颜色
+        x_limits: X轴显示范围 [最小值, 最大值]（可选），只绘制范围内的数据
+        y_limits: Y轴显示范围 [最小值, 最大值]（可选）
+        downsample: 点数超过阈值时按像素列做最小/最大值降采样
+        width: 图表宽度（英寸）
+        height: 图表高度（英寸）
+        dpi: 输出分辨率
+        save_file: 是否同时把PNG保存到本地图片目录
     
     Returns:
-        base64编码的图像字符串
+        图表的PNG图像内容及说明文字
     """
     try:
-        plt.figure(figsize=(10, 6))
-        
-        plt.plot(x_data, y_data, linestyle=line_style, color=color, linewidth=2, marker='o', markersize=4)
-        plt.xlabel(x_label, fontsize=12)
-        plt.ylabel(y_label, fontsize=12)
-        plt.title(title, fontsize=16, fontweight='bold')
-        plt.grid(True, alpha=0.3)
-        plt.tight_layout()
-        
-        return save_and_show_plot("line_plot")
-        
+        png = await render_chart(draw_line_plot, width, height, dpi,
+                                 x_data=x_data, y_data=y_data, title=title, x_label=x_label,
+                                 y_label=y_label, line_style=line_style, color=color,
+                                 x_limits=x_limits, y_limits=y_limits, downsample=downsample)
+        return await plot_result(png, save_file)
+    
     except Exception as e:
         return f"创建折线图时出错: {str(e)}"
 
-@mcp.tool()
+def draw_heatmap(fig: Figure, data: List[List[float]], x_labels: Optional[List[str]],
+                 y_labels: Optional[List[str]], title: str, colormap: str) -> None:
+    """绘制热力图"""
+    ax = fig.add_subplot(111)
+    
+    im = ax.imshow(data, cmap=colormap, aspect='auto')
+    
+    if x_labels:
+        ax.set_xticks(range(len(x_labels)), x_labels, rotation=45, ha='right')
+    if y_labels:
+        ax.set_yticks(range(len(y_labels)), y_labels)
+    
+    fig.colorbar(im, ax=ax, shrink=0.8)
+    ax.set_title(title, fontsize=16, fontweight='bold')
+    fig.tight_layout()
+
+@mcp.tool(structured_output=False)
 async def create_heatmap(
     data: List[List[float]],
     x_labels: Optional[List[str]] = None,
     y_labels: Optional[List[str]] = None,
     title: str = "热力图",
-    colormap: str = "viridis"
-) -> str:
+    colormap: str = "viridis",
+    width: float = 10,
+    height: float = 8,
+    dpi: int = DEFAULT_DPI,
+    save_file: bool = False
+) -> PlotResult:
     """创建热力图
     
     Args:
@@ -366,30 +977,45 @@ async def create_heatmap(
         y_labels: Y轴标签（可选）
         title: 图表标题
         colormap: 颜色映射 ("viridis", "plasma", "hot", "cool")
+        width: 图表宽度（英寸）
+        height: 图表高度（英寸）
+        dpi: 输出分辨率
+        save_file: 是否同时把PNG保存到本地图片目录
     
     Returns:
-        base64编码的图像字符串
+        图表的PNG图像内容及说明文字
     """
     try:
-        plt.figure(figsize=(10, 8))
-        
-        im = plt.imshow(data, cmap=colormap, aspect='auto')
-        
-        if x_labels:
-            plt.xticks(range(len(x_labels)), x_labels, rotation=45, ha='right')
-        if y_labels:
-            plt.yticks(range(len(y_labels)), y_labels)
-            
-        plt.colorbar(im, shrink=0.8)
-        plt.title(title, fontsize=16, fontweight='bold')
-        plt.tight_layout()
-        
-        return save_and_show_plot("heatmap")
-        
+        png = await render_chart(draw_heatmap, width, height, dpi,
+                                 data=data, x_labels=x_labels, y_labels=y_labels,
+                                 title=title, colormap=colormap)
+        return await plot_result(png, save_file)
+    
     except Exception as e:
         return f"创建热力图时出错: {str(e)}"
 
+@mcp.tool()
+async def get_render_stats() -> str:
+    """获取渲染缓存命中率、内存占用和渲染进程池状态
+    """
+    cache = _render_cache
+    lookups = cache.hits + cache.misses
+    hit_rate = cache.hits / lookups * 100 if lookups else 0.0
+    return "\n".join([
+        "渲染缓存:",
+        f"  条目: {len(cache.entries)}",
+        f"  内存: {cache.used:,} / {cache.budget:,} 字节",
+        f"  命中: {cache.hits:,}",
+        f"  未命中: {cache.misses:,}",
+        f"  命中率: {hit_rate:.1f}%",
+        f"  淘汰: {cache.evictions:,}",
+        f"  平均渲染耗时: {cache.render_time / max(cache.renders, 1) * 1000:.1f} ms",
+        f"渲染进程: {_render_pool.workers}个，{_render_pool.waiting}个请求等待中，"
+        f"队列上限{_render_pool.queue_size}，超时{RENDER_TIMEOUT}秒",
+    ])
+
 if __name__ == "__main__":
     # Initialize and run the server
+    _render_pool.start()
     mcp.run(transport='stdio')
 